@@ -1,4 +1,39 @@
 import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _evaluate(matrix, P, Q, eps):
+    """Выигрыш H(P,Q), выигрыши H(P,Bk) по столбцам и маски активных стратегий."""
+    m, n = matrix.shape
+    H = 0.0
+    for i in range(m):
+        row = 0.0
+        for j in range(n):
+            row += matrix[i, j] * Q[j]
+        H += P[i] * row
+    HB = np.empty(n)
+    for j in range(n):
+        s = 0.0
+        for i in range(m):
+            s += matrix[i, j] * P[i]
+        HB[j] = s
+    return H, HB, P > eps, Q > eps
+
+
+if njit is not None:
+    # Компилируется один раз (cache=True), дальше работает как нативный код
+    evaluate = njit(cache=True)(_evaluate)
+else:
+    def evaluate(matrix, P, Q, eps):
+        # Билинейная форма одной сверткой, без промежуточного вектора P @ matrix
+        H = float(np.einsum('i,ij,j->', P, matrix, Q, optimize=True))
+        return H, np.einsum('i,ij->j', P, matrix), P > eps, Q > eps
+
+
 print("Вариант 7")
 print("\n1. Находим седло:")
 matrix = np.array([
@@ -13,8 +48,8 @@ print("Матрица игры:")
 print(matrix)
 print()
 
-lower_price = max([min(x) for x in matrix])
-upper_price = min([max(x) for x in np.rot90(matrix)])
+lower_price = matrix.min(axis=1).max()
+upper_price = matrix.max(axis=0).min()
 print(f"Нижняя цена игры (α): {lower_price}")
 print(f"Верхняя цена игры (β): {upper_price}")
 
@@ -25,29 +60,23 @@ else:
     print()
 
 print("2. Расчет выигрышей:")
-P = [0.0, 0.0, 0.63, 0.37, 0.0]
-Q = [0.0, 0.25, 0.0, 0.0, 0.75]
-
-buff = 0
-for i, pin in zip(matrix, P):
-    buff += pin * sum([x * y for x, y in zip(i, Q)])
-
-answer = {}
-answer["H(P,Q)"] = buff
+P = np.array([0.0, 0.0, 0.63, 0.37, 0.0])
+Q = np.array([0.0, 0.25, 0.0, 0.0, 0.75])
 
-for k, i in enumerate(np.rot90(matrix), 1):
-    answer["H(P,B{})".format(k)] = sum([x * y for x, y in zip(i, P)])
+H, col_vals, mask_A, mask_B = evaluate(np.ascontiguousarray(matrix, dtype=np.float64), P, Q, 0.001)
 
-for situation, win in answer.items():
-    print(f"Ответ выигрыш игрока A в ситуации {situation} = {win:.3f}")
+# Подписи ситуаций формируются только при выводе
+print(f"Ответ выигрыш игрока A в ситуации H(P,Q) = {H:.3f}")
+for k, win in enumerate(col_vals, 1):
+    print(f"Ответ выигрыш игрока A в ситуации H(P,B{k}) = {win:.3f}")
 
 print("\n3. Активные стратегии:")
-active_A = [f"A{i+1}" for i in range(len(P)) if P[i] > 0.001]
-active_B = [f"B{i+1}" for i in range(len(Q)) if Q[i] > 0.001]
+active_A = [f"A{i+1}" for i in np.flatnonzero(mask_A)]
+active_B = [f"B{i+1}" for i in np.flatnonzero(mask_B)]
 print(f"Активные стратегии A: {active_A}")
 print(f"Активные стратегии B: {active_B}")
 
 print("\n4. Итог:")
-print(f"Цена игры: {answer['H(P,Q)']:.3f}")
-print(f"P = {P}")
-print(f"Q = {Q}")
\ No newline at end of file
+print(f"Цена игры: {H:.3f}")
+print(f"P = {P.tolist()}")
+print(f"Q = {Q.tolist()}")
\ No newline at end of file
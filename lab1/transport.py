@@ -1,36 +1,42 @@
 from pulp import *
+import numpy as np
+import shutil
 import time
 
+try:
+    import networkx as nx
+except ImportError:
+    nx = None
+
 print("ТРАНСПОРТНАЯ ЗАДАЧА - ВАРИАНТ 7")
 
 supply = [200, 200, 300, 300, 100]  
 demand = [300, 200, 100, 100, 200]  
 
-cost_matrix = [
+cost_matrix = np.array([
     [4, 6, 3, 4, 1],
     [7, 3, 5, 2, 2],
     [5, 3, 2, 4, 4],
     [2, 3, 4, 6, 5],
     [1, 4, 4, 3, 3]
-]
-
-print("Дано:")
-print(f"Запасы поставщиков: {supply} (сумма = {sum(supply)})")
-print(f"Потребности потребителей: {demand} (сумма = {sum(demand)})")
+], dtype=np.int64)
 
 total_supply = sum(supply)
 total_demand = sum(demand)
 
+print("Дано:")
+print(f"Запасы поставщиков: {supply} (сумма = {total_supply})")
+print(f"Потребности потребителей: {demand} (сумма = {total_demand})")
+
 if total_supply != total_demand:
     print(f"\nЗадача несбалансированная! Разница: {abs(total_supply - total_demand)}")
     if total_supply < total_demand: 
         supply.append(total_demand - total_supply)
-        cost_matrix.append([0, 0, 0, 0, 0])
+        cost_matrix = np.pad(cost_matrix, ((0, 1), (0, 0)))
         print("Добавлен фиктивный поставщик")
     else:
         demand.append(total_supply - total_demand)
-        for row in cost_matrix:
-            row.append(0)
+        cost_matrix = np.pad(cost_matrix, ((0, 0), (0, 1)))
         print("Добавлен фиктивный потребитель")
 
 m = len(supply)
@@ -42,49 +48,68 @@ print("Решение методом PULP с HiGHS")
 
 start_time = time.time()
 
-variables = []
-for i in range(m):
-    for j in range(n):
-        variables.append(LpVariable(f"x_{i+1}_{j+1}", lowBound=0)) 
+variables = [LpVariable(f"x_{i+1}_{j+1}", lowBound=0) for i in range(m) for j in range(n)]
+# Те же переменные в виде матрицы m×n: строки и столбцы берутся срезами без пересчета индексов
+X = np.array(variables, dtype=object).reshape(m, n)
 
 problem = LpProblem("Transport_Problem", LpMinimize)
 
-cost_coeffs = []
-for i in range(m):
-    for j in range(n):
-        cost_coeffs.append(cost_matrix[i][j])
+cost_coeffs = cost_matrix.ravel().tolist()
 
 problem += lpDot(cost_coeffs, variables), "Total_Cost" 
 
+# Ссылки на ограничения сохраняются, чтобы менять правые части без перестроения модели
+supply_constraints = []
 for i in range(m):
-    constraint_vars = variables[i*n : (i+1)*n] 
-    problem += lpSum(constraint_vars) == supply[i], f"Supply_{i+1}" 
+    constraint = lpSum(X[i].tolist()) == supply[i]
+    problem += constraint, f"Supply_{i+1}" 
+    supply_constraints.append(constraint)
 
+demand_constraints = []
 for j in range(n):
-    constraint_vars = [variables[i*n + j] for i in range(m)]
-    problem += lpSum(constraint_vars) == demand[j], f"Demand_{j+1}"
-
-solver = HiGHS_CMD(path="/opt/homebrew/bin/highs")
+    constraint = lpSum(X[:, j].tolist()) == demand[j]
+    problem += constraint, f"Demand_{j+1}"
+    demand_constraints.append(constraint)
+
+# HiGHS вызывается в том же процессе через highspy (без записи LP-файла и запуска бинарника)
+# Решатель выбирается один раз и переиспользуется во всех решениях
+solver = HiGHS(msg=False)
+if not solver.available():
+    # highspy не установлен - ищем бинарник highs в PATH вместо жестко заданного пути
+    solver = HiGHS_CMD(path=shutil.which("highs"), msg=False)
 problem.solve(solver)
 pulp_time = time.time() - start_time
 
+
+def resolve(new_supply, new_demand):
+    """
+    Повторное решение задачи с новыми запасами и потребностями.
+    Модель и экземпляр решателя переиспользуются, меняются только правые части ограничений.
+    """
+    for constraint, rhs in zip(supply_constraints, new_supply):
+        constraint.changeRHS(rhs)
+    for constraint, rhs in zip(demand_constraints, new_demand):
+        constraint.changeRHS(rhs)
+    problem.solve(solver)
+    return value(problem.objective)
+
+
 print("\nОПТИМАЛЬНЫЙ ПЛАН ПЕРЕВОЗОК:")
 
 total_cost = 0
-allocation_matrix = [[0 for _ in range(n)] for _ in range(m)]
-
-for variable in problem.variables():
-    if variable.varValue > 0.001: 
-        parts = variable.name.split('_')
-        supplier = int(parts[1])  
-        consumer = int(parts[2])  
-        amount = variable.varValue
-        cost = amount * cost_matrix[supplier-1][consumer-1] 
+allocation_matrix = np.zeros((m, n))
+
+# variables построены построчно, поэтому индекс k сам задает пару (поставщик, потребитель)
+for k, variable in enumerate(variables):
+    amount = variable.varValue
+    if amount > 0.001: 
+        i, j = divmod(k, n)
+        cost = amount * cost_matrix[i, j] 
         total_cost += cost
         
-        allocation_matrix[supplier-1][consumer-1] = amount
+        allocation_matrix[i, j] = amount
         
-        print(f"поставщик{supplier} → потребитель{consumer}: {amount:.1f} ед. × {cost_matrix[supplier-1][consumer-1]} = {cost:.1f}")
+        print(f"поставщик{i+1} → потребитель{j+1}: {amount:.1f} ед. × {cost_matrix[i, j]} = {cost:.1f}")
 
 print(f"\nМатрица перевозок:")
 for i, row in enumerate(allocation_matrix):
@@ -94,13 +119,46 @@ print(f"\nМинимальная стоимость: {total_cost:.1f}")
 
 # Проверка выполнения ограничений
 print("\nПроверка выполнения ограничений:")
-for i in range(m):
-    total_sent = sum(allocation_matrix[i])
+for i, total_sent in enumerate(allocation_matrix.sum(axis=1)):
     print(f"Поставщик {i+1}: отправил {total_sent:.1f} ед. (должен {supply[i]} ед.)")
 
-for j in range(n):
-    total_received = sum(allocation_matrix[i][j] for i in range(m))
+for j, total_received in enumerate(allocation_matrix.sum(axis=0)):
     print(f"Потребитель {j+1}: получил {total_received:.1f} ед. (нужно {demand[j]} ед.)")
 
 print(f"\nВремя выполнения: {pulp_time:.4f} сек")
-print(f"Статус решения: {LpStatus[problem.status]}")
\ No newline at end of file
+print(f"Статус решения: {LpStatus[problem.status]}")
+
+# Параметрический анализ: модель строится один раз, для каждого сценария меняются только правые части
+print("\nАнализ сценариев (изменение всех запасов и потребностей):")
+for factor in (0.9, 1.1, 1.25):
+    scenario_cost = resolve([s * factor for s in supply], [d * factor for d in demand])
+    print(f"Масштаб {factor:.2f}: минимальная стоимость {scenario_cost:.1f} ({LpStatus[problem.status]})")
+
+# Транспортная задача - это поток минимальной стоимости на двудольном графе,
+# поэтому ее можно решить специализированным сетевым симплекс-методом без LP-решателя
+if nx is not None:
+    print("\nРешение сетевым симплекс-методом (networkx)")
+
+    start_time = time.time()
+
+    total = sum(supply)
+    G = nx.DiGraph()
+    G.add_node("S", demand=-total)
+    G.add_node("T", demand=total)
+    for i in range(m):
+        G.add_edge("S", f"s{i}", capacity=supply[i], weight=0)
+    for j in range(n):
+        G.add_edge(f"d{j}", "T", capacity=demand[j], weight=0)
+    for i in range(m):
+        for j in range(n):
+            G.add_edge(f"s{i}", f"d{j}", capacity=min(supply[i], demand[j]), weight=cost_matrix[i, j])
+
+    flow_cost, flow_dict = nx.network_simplex(G)
+    network_time = time.time() - start_time
+
+    network_matrix = [[flow_dict[f"s{i}"][f"d{j}"] for j in range(n)] for i in range(m)]
+    for i, row in enumerate(network_matrix):
+        print(f"Поставщик {i+1}: {row}")
+
+    print(f"Минимальная стоимость: {flow_cost}")
+    print(f"Время выполнения: {network_time:.4f} сек")
@@ -0,0 +1,223 @@
+"""
+Вычислительные ядра алгоритмов распределения ресурсов.
+Работают только с массивами NumPy и компилируются Numba (если она установлена),
+поэтому внутренние циклы выполняются без накладных расходов интерпретатора.
+Ядра компилируются с nogil=True, чтобы альтернативы считались в потоках параллельно;
+parallel=True намеренно не используется, чтобы не получить вложенный параллелизм.
+"""
+
+import heapq
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Заглушка декоратора: без Numba ядра выполняются как обычный Python/NumPy код."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Допуск сравнения остатка часов и запаса до порога загрузки с нулем
+CAP_EPS = 1e-9
+
+
+@njit(nogil=True, cache=True)
+def fill_need(hours, order, need):
+    """
+    Набор требуемых часов у ресурсов в заданном порядке.
+    Ресурсы отдают часы целиком, пока не останется частичный остаток потребности:
+    вместо поштучного цикла используется cumsum + searchsorted.
+    Массив hours уменьшается на месте.
+
+    Args:
+        hours: Оставшиеся часы ресурсов
+        order: Индексы ресурсов в порядке перебора
+        need: Сколько часов требуется набрать
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Индексы задействованных ресурсов и выделенные им часы
+    """
+    if need <= 0:
+        return order[:0], hours[:0]
+
+    available = hours[order]
+    cumulative = np.cumsum(available)
+    k = np.searchsorted(cumulative, need)
+
+    if k < len(order):
+        taken = available[:k + 1].copy()
+        taken[k] = need - (cumulative[k - 1] if k > 0 else 0.0)
+    else:
+        taken = available
+
+    idx = order[:len(taken)]
+    hours[idx] = hours[idx] - taken
+
+    used = taken > 0
+    return idx[used], taken[used]
+
+
+@njit(nogil=True, cache=True)
+def fill_tasks_kernel(resource_hours, needs, task_order):
+    """
+    Последовательное покрытие задач ресурсами в исходном порядке ресурсов.
+    Используется распределением по приоритету и равномерным распределением.
+
+    Args:
+        resource_hours: Оставшиеся часы ресурсов (изменяется на месте)
+        needs: Сколько часов набрать для каждой задачи
+        task_order: Порядок обхода задач
+
+    Returns:
+        Tuple[np.ndarray, ...]: Индексы ресурсов, индексы задач и часы распределений,
+        итоговая загрузка ресурсов и покрытие задач
+    """
+    n_resources = len(resource_hours)
+    # Каждая задача берет часы у каждого ресурса не больше одного раза
+    r_out = np.empty(n_resources * len(task_order), dtype=np.int64)
+    t_out = np.empty(n_resources * len(task_order), dtype=np.int64)
+    h_out = np.empty(n_resources * len(task_order), dtype=resource_hours.dtype)
+    resource_allocated = np.zeros(n_resources, dtype=resource_hours.dtype)
+    task_allocated = np.zeros(len(needs), dtype=resource_hours.dtype)
+
+    resource_order = np.arange(n_resources)
+    pos = 0
+    for t in task_order:
+        idx, taken = fill_need(resource_hours, resource_order, needs[t])
+        for i in range(len(idx)):
+            r_out[pos] = idx[i]
+            t_out[pos] = t
+            h_out[pos] = taken[i]
+            pos += 1
+            resource_allocated[idx[i]] += taken[i]
+            task_allocated[t] += taken[i]
+
+    return r_out[:pos], t_out[:pos], h_out[:pos], resource_allocated, task_allocated
+
+
+@njit(nogil=True, cache=True)
+def minimize_overload_kernel(resource_hours, needs, task_order, load_cap):
+    """
+    Распределение с ограничением загрузки ресурса: на каждом шаге выбирается
+    ресурс с минимальной текущей загрузкой, не достигший порога load_cap.
+
+    Args:
+        resource_hours: Оставшиеся часы ресурсов (изменяется на месте)
+        needs: Требуемые часы задач
+        task_order: Порядок обхода задач
+        load_cap: Максимальная загрузка одного ресурса
+
+    Returns:
+        Tuple[np.ndarray, ...]: Индексы ресурсов, индексы задач и часы распределений,
+        итоговая загрузка ресурсов и покрытие задач
+    """
+    n_resources = len(resource_hours)
+    # Выбранный ресурс либо закрывает задачу, либо исчерпывается, либо упирается в порог,
+    # поэтому на одну задачу приходится не больше n_resources распределений
+    r_out = np.empty(n_resources * len(task_order), dtype=np.int64)
+    t_out = np.empty(n_resources * len(task_order), dtype=np.int64)
+    h_out = np.empty(n_resources * len(task_order), dtype=resource_hours.dtype)
+    resource_allocated = np.zeros(n_resources, dtype=resource_hours.dtype)
+    task_allocated = np.zeros(len(needs), dtype=resource_hours.dtype)
+
+    # Куча кандидатов (загрузка, индекс): в ней лежат ровно те ресурсы, у которых есть часы
+    # и запас до порога. Меняется только загрузка извлеченного ресурса, поэтому после
+    # распределения он просто возвращается в кучу с новым ключом (если еще подходит).
+    # При равной загрузке первым извлекается ресурс с меньшим индексом.
+    heap = [(resource_allocated[r], r) for r in range(n_resources)
+            if resource_hours[r] > 0 and resource_allocated[r] < load_cap]
+    heapq.heapify(heap)
+
+    pos = 0
+    for t in task_order:
+        remaining_need = needs[t]
+
+        while remaining_need > 0:
+            # Ресурсы, упершиеся в порог, взять часы уже не могут
+            if len(heap) == 0:
+                break
+            best = heapq.heappop(heap)[1]
+
+            hours_to_allocate = min(
+                remaining_need,
+                resource_hours[best],
+                load_cap - resource_allocated[best]
+            )
+            r_out[pos] = best
+            t_out[pos] = t
+            h_out[pos] = hours_to_allocate
+            pos += 1
+            resource_hours[best] -= hours_to_allocate
+            resource_allocated[best] += hours_to_allocate
+            task_allocated[t] += hours_to_allocate
+            remaining_need -= hours_to_allocate
+
+            # Сравнение с допуском: после вычитания остаток до порога может оказаться
+            # равным одному ulp, и ресурс получил бы исчезающе малое повторное
+            # распределение на ту же задачу
+            if resource_hours[best] > CAP_EPS and load_cap - resource_allocated[best] > CAP_EPS:
+                heapq.heappush(heap, (resource_allocated[best], best))
+
+    return r_out[:pos], t_out[:pos], h_out[:pos], resource_allocated, task_allocated
+
+
+@njit(nogil=True, cache=True)
+def greedy_kernel(resource_hours, needs, task_order, min_hours):
+    """
+    Жадное покрытие задач: ресурсы перебираются по убыванию эффективности
+    (оставшиеся часы / текущая загрузка), при равенстве - по убыванию оставшихся часов.
+
+    Args:
+        resource_hours: Оставшиеся часы ресурсов (изменяется на месте)
+        needs: Требуемые часы задач
+        task_order: Порядок обхода задач
+        min_hours: Минимальный размер распределения
+
+    Returns:
+        Tuple[np.ndarray, ...]: Индексы ресурсов, индексы задач и часы распределений,
+        итоговая загрузка ресурсов и покрытие задач
+    """
+    n_resources = len(resource_hours)
+    r_out = np.empty(n_resources * len(task_order), dtype=np.int64)
+    t_out = np.empty(n_resources * len(task_order), dtype=np.int64)
+    h_out = np.empty(n_resources * len(task_order), dtype=resource_hours.dtype)
+    resource_allocated = np.zeros(n_resources, dtype=resource_hours.dtype)
+    task_allocated = np.zeros(len(needs), dtype=resource_hours.dtype)
+
+    pos = 0
+    for t in task_order:
+        candidates = np.flatnonzero(resource_hours > min_hours)
+        if len(candidates) == 0:
+            break
+
+        # Пока задача не покрыта, выбранный ресурс отдает все часы и выбывает,
+        # а ключи остальных не меняются - поэтому порядок считается один раз на задачу.
+        # Две устойчивые сортировки: сначала по часам, затем по эффективности.
+        efficiency = resource_hours[candidates] / np.maximum(resource_allocated[candidates], 1.0)
+        by_hours = np.argsort(-resource_hours[candidates], kind="mergesort")
+        by_efficiency = np.argsort(-efficiency[by_hours], kind="mergesort")
+        order = candidates[by_hours][by_efficiency]
+
+        idx, taken = fill_need(resource_hours, order, needs[t])
+        n_taken = len(taken)
+        if n_taken > 0 and taken[n_taken - 1] <= min_hours:
+            # Игнорируем очень маленькие распределения
+            resource_hours[idx[n_taken - 1]] += taken[n_taken - 1]
+            n_taken -= 1
+
+        # Индексы в idx уникальны, поэтому загрузка обновляется одной векторной операцией
+        idx = idx[:n_taken]
+        taken = taken[:n_taken]
+        r_out[pos:pos + n_taken] = idx
+        t_out[pos:pos + n_taken] = t
+        h_out[pos:pos + n_taken] = taken
+        pos += n_taken
+        resource_allocated[idx] = resource_allocated[idx] + taken
+        task_allocated[t] += taken.sum()
+
+    return r_out[:pos], t_out[:pos], h_out[:pos], resource_allocated, task_allocated
@@ -0,0 +1,60 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Скомпилированная (Cython) версия примитива fill_need из _algorithms_nb.
+Используется при вызовах из Python-кода (распределение по специализации),
+где накладные расходы диспетчера Numba сравнимы с самой работой.
+Результат совпадает с версией на Numba.
+
+Сборка (необязательна, без нее используется версия на Numba):
+    cythonize -i _alloc_core.pyx
+"""
+
+import numpy as np
+from libc.stdint cimport int64_t
+
+
+def fill_need(double[::1] hours, const int64_t[::1] order, double need):
+    """
+    Набор требуемых часов у ресурсов в заданном порядке.
+    Ресурсы отдают часы целиком, пока не останется частичный остаток потребности.
+    Массив hours уменьшается на месте.
+
+    Args:
+        hours: Оставшиеся часы ресурсов
+        order: Индексы ресурсов в порядке перебора
+        need: Сколько часов требуется набрать
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Индексы задействованных ресурсов и выделенные им часы
+    """
+    cdef Py_ssize_t n = order.shape[0]
+    idx = np.empty(n, dtype=np.int64)
+    taken = np.empty(n, dtype=np.float64)
+    cdef int64_t[::1] idx_view = idx
+    cdef double[::1] taken_view = taken
+    cdef Py_ssize_t i, count = 0
+    cdef int64_t r
+    cdef double cumulative = 0.0, previous = 0.0, amount
+
+    if need <= 0:
+        return idx[:0], taken[:0]
+
+    with nogil:
+        for i in range(n):
+            r = order[i]
+            cumulative = previous + hours[r]
+            if cumulative >= need:
+                # Последний ресурс отдает только недостающий остаток
+                amount = need - previous
+            else:
+                amount = hours[r]
+            hours[r] -= amount
+            if amount > 0:
+                idx_view[count] = r
+                taken_view[count] = amount
+                count += 1
+            if cumulative >= need:
+                break
+            previous = cumulative
+
+    return idx[:count], taken[:count]
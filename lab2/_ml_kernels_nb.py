@@ -0,0 +1,217 @@
+"""
+Вычислительные ядра для характеристик альтернатив (покрытие, приоритет,
+равномерность загрузки, перегрузка). Работают с массивами NumPy и компилируются
+Numba (если она установлена): суммы по задачам и ресурсам, взвешивание приоритетов
+и дисперсия считаются явными циклами без временных массивов. Признаки для набора
+альтернатив (обучение модели) считаются параллельно, без GIL.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Заглушка декоратора: без Numba ядра выполняются как обычный Python/NumPy код."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(nogil=True, cache=True)
+def _alternative_aggregates(hours, task_idx, resource_idx, required, priority, available):
+    """
+    Общая часть расчета характеристик альтернативы по ее распределениям.
+    Распределения с индексом -1 (задача или ресурс отсутствуют в списках)
+    учитываются только в общем покрытии.
+
+    Args:
+        hours: Часы распределений
+        task_idx: Позиции задач распределений в массивах задач
+        resource_idx: Позиции ресурсов распределений в массивах ресурсов
+        required: Требуемые часы задач
+        priority: Приоритеты задач (1-5)
+        available: Доступные часы ресурсов
+
+    Returns:
+        Tuple[float, float, float, float]: Покрытие, приоритетный бонус,
+        стандартное отклонение загрузки ресурсов (-1, если нет ресурсов с часами)
+        и штраф за перегрузку
+    """
+    n_tasks = len(required)
+    n_resources = len(available)
+    task_hours = np.zeros(n_tasks)
+    resource_load = np.zeros(n_resources)
+
+    total_allocated = 0.0
+    for i in range(len(hours)):
+        total_allocated += hours[i]
+        if task_idx[i] >= 0:
+            task_hours[task_idx[i]] += hours[i]
+        if resource_idx[i] >= 0:
+            resource_load[resource_idx[i]] += hours[i]
+
+    # Покрытие задач и приоритетный бонус
+    total_required = 0.0
+    priority_sum = 0.0
+    for t in range(n_tasks):
+        total_required += required[t]
+        priority_sum += min(1.0, task_hours[t] / required[t]) * (6.0 - priority[t]) / 5.0
+    coverage = total_allocated / total_required if total_required > 0 else 0.0
+    priority_score = priority_sum / n_tasks if n_tasks > 0 else 0.0
+
+    # Равномерность загрузки: стандартное отклонение загрузки в два прохода, как в np.std
+    n_used = 0
+    utilization_sum = 0.0
+    total_overload = 0.0
+    for r in range(n_resources):
+        if available[r] > 0:
+            n_used += 1
+            utilization_sum += resource_load[r] / available[r]
+        total_overload += max(0.0, resource_load[r] - available[r])
+
+    utilization_std = -1.0
+    if n_used > 0:
+        mean = utilization_sum / n_used
+        variance = 0.0
+        for r in range(n_resources):
+            if available[r] > 0:
+                deviation = resource_load[r] / available[r] - mean
+                variance += deviation * deviation
+        utilization_std = np.sqrt(variance / n_used)
+
+    # Штраф за перегрузку
+    overload_penalty = min(1.0, total_overload / total_required) if total_required > 0 else 0.0
+
+    return coverage, priority_score, utilization_std, overload_penalty
+
+
+@njit(nogil=True, cache=True)
+def score_alternative(hours, task_idx, resource_idx, required, priority, available):
+    """
+    Расчет характеристик альтернативы по ее распределениям.
+
+    Args:
+        hours: Часы распределений
+        task_idx: Позиции задач распределений в массивах задач (-1 - задачи нет в списке)
+        resource_idx: Позиции ресурсов распределений в массивах ресурсов (-1 - ресурса нет в списке)
+        required: Требуемые часы задач
+        priority: Приоритеты задач (1-5)
+        available: Доступные часы ресурсов
+
+    Returns:
+        Tuple[float, float, float, float]: Покрытие, приоритетный бонус,
+        равномерность загрузки и штраф за перегрузку
+    """
+    coverage, priority_score, utilization_std, overload_penalty = _alternative_aggregates(
+        hours, task_idx, resource_idx, required, priority, available
+    )
+    balance_score = 0.5 if utilization_std < 0 else max(0.0, min(1.0, 1.0 - utilization_std))
+    return coverage, priority_score, balance_score, overload_penalty
+
+
+@njit(nogil=True, cache=True)
+def _write_features(out, hours, task_idx, resource_idx, score,
+                    required, priority, available, total_required, total_available):
+    """
+    Запись вектора признаков ML модели одной альтернативы в строку out.
+    Признаки совпадают с AlternativeRecommender.extract_features.
+
+    Args:
+        out: Строка для признаков (длина 11)
+        hours: Часы распределений альтернативы
+        task_idx: Позиции задач распределений (-1 - задачи нет в списке)
+        resource_idx: Позиции ресурсов распределений (-1 - ресурса нет в списке)
+        score: Балл альтернативы
+        required: Требуемые часы задач
+        priority: Приоритеты задач (1-5)
+        available: Доступные часы ресурсов
+        total_required: Сумма требуемых часов
+        total_available: Сумма доступных часов
+    """
+    coverage, priority_score, utilization_std, overload_penalty = _alternative_aggregates(
+        hours, task_idx, resource_idx, required, priority, available
+    )
+    out[0] = coverage
+    out[1] = priority_score
+    out[2] = 0.5 if utilization_std < 0 else max(0.0, min(1.0, 1.0 - utilization_std))
+    out[3] = overload_penalty
+    out[4] = score / 100.0
+    out[5] = len(hours) / 50.0
+    out[6] = len(available) / 20.0
+    out[7] = len(required) / 20.0
+    out[8] = total_required / 1000.0
+    out[9] = total_available / 1000.0
+    out[10] = 0.5 if utilization_std < 0 else utilization_std
+
+
+@njit(nogil=True, cache=True)
+def fill_features(out, hours, task_idx, resource_idx, score, required, priority, available):
+    """
+    Вектор признаков ML модели одной альтернативы (предсказание по одной альтернативе).
+
+    Args:
+        out: Строка для признаков (длина 11)
+        hours: Часы распределений альтернативы
+        task_idx: Позиции задач распределений (-1 - задачи нет в списке)
+        resource_idx: Позиции ресурсов распределений (-1 - ресурса нет в списке)
+        score: Балл альтернативы
+        required: Требуемые часы задач
+        priority: Приоритеты задач (1-5)
+        available: Доступные часы ресурсов
+    """
+    _write_features(out, hours, task_idx, resource_idx, score,
+                    required, priority, available, required.sum(), available.sum())
+
+
+@njit(parallel=True, cache=True)
+def extract_features_batch(hours, task_idx, resource_idx, offsets, scores, required, priority, available):
+    """
+    Векторы признаков ML модели сразу для набора альтернатив.
+    Распределения всех альтернатив переданы одними массивами, границы альтернатив
+    задает offsets; альтернативы независимы и обрабатываются параллельно (prange).
+    Признаки совпадают с AlternativeRecommender.extract_features.
+
+    Args:
+        hours: Часы распределений всех альтернатив
+        task_idx: Позиции задач распределений (-1 - задачи нет в списке)
+        resource_idx: Позиции ресурсов распределений (-1 - ресурса нет в списке)
+        offsets: Границы распределений альтернатив (длина - число альтернатив + 1)
+        scores: Баллы альтернатив
+        required: Требуемые часы задач
+        priority: Приоритеты задач (1-5)
+        available: Доступные часы ресурсов
+
+    Returns:
+        np.ndarray: Матрица признаков float32 (число альтернатив x 11)
+    """
+    n_alternatives = len(offsets) - 1
+    # Признаки считаются в float64, а хранятся в float32 - типе, с которым работают модели
+    features = np.empty((n_alternatives, 11), dtype=np.float32)
+    total_required = required.sum()
+    total_available = available.sum()
+
+    for a in prange(n_alternatives):
+        start = offsets[a]
+        end = offsets[a + 1]
+        _write_features(features[a], hours[start:end], task_idx[start:end], resource_idx[start:end],
+                        scores[a], required, priority, available, total_required, total_available)
+
+    return features
+
+
+if NUMBA_AVAILABLE:
+    # Пул потоков параллельных ядер запускается сразу при импорте, в главном потоке:
+    # пул (слой TBB), впервые запущенный из рабочего потока (endpoints FastAPI
+    # выполняются в пуле потоков), может не дать процессу завершиться
+    _empty = np.empty(0)
+    _empty_idx = np.empty(0, dtype=np.int64)
+    extract_features_batch(_empty, _empty_idx, _empty_idx, np.zeros(1, dtype=np.int64),
+                           _empty, _empty, _empty, _empty)
+    # Компиляция (или загрузка из кэша) ядра одной альтернативы до первого запроса
+    fill_features(np.empty(11, dtype=np.float32), _empty, _empty_idx, _empty_idx, 0.0,
+                  _empty, _empty, _empty)
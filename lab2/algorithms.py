@@ -5,8 +5,198 @@
 """
 
 from typing import List, Dict, Tuple
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from models import Resource, Task
-import copy
+from _algorithms_nb import fill_need, fill_tasks_kernel, minimize_overload_kernel, greedy_kernel
+import numpy as np
+
+try:
+    # Собранное расширение Cython: fill_need без накладных расходов диспетчера Numba
+    from _alloc_core import fill_need
+    ALLOC_CORE_AVAILABLE = True
+except ImportError:
+    ALLOC_CORE_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# Словарь соответствий типов ресурсов и ключевых слов в названиях задач
+TYPE_MATCHING = {
+    "разработчик": ["разработка", "код", "программирование", "функционал", "система"],
+    "дизайнер": ["дизайн", "интерфейс", "ui", "ux", "макет"],
+    "тестировщик": ["тестирование", "тест", "проверка", "qa"],
+    "аналитик": ["анализ", "требования", "документация", "исследование"],
+    "менеджер проекта": ["проект", "управление", "координация", "планирование"]
+}
+
+# Целочисленные коды известных типов ресурсов (в порядке TYPE_MATCHING)
+TYPE_IDS = {resource_type: code for code, resource_type in enumerate(TYPE_MATCHING)}
+
+# Пул потоков для параллельного запуска алгоритмов (по одному потоку на альтернативу)
+_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="allocator")
+
+# Формат записи распределения, в котором работают алгоритмы
+ALLOCATION_DTYPE = np.dtype([
+    ("resource_id", np.int32),
+    ("task_id", np.int32),
+    ("hours", np.float64)
+])
+
+# Автомат Ахо-Корасик по всем ключевым словам строится один раз при импорте:
+# поиск всех совпадений в названии задачи выполняется за один проход по строке
+_keyword_automaton = None
+if AHOCORASICK_AVAILABLE:
+    _keyword_automaton = ahocorasick.Automaton()
+    for _resource_type, _keywords in TYPE_MATCHING.items():
+        for _keyword in _keywords:
+            _keyword_automaton.add_word(_keyword, TYPE_IDS[_resource_type])
+    _keyword_automaton.make_automaton()
+
+
+@dataclass
+class _AllocationInput:
+    """
+    Входные данные для алгоритмов в виде набора массивов (Structure of Arrays).
+    Позиция в массиве совпадает с позицией ресурса/задачи в исходном списке.
+    
+    Атрибуты:
+        resource_ids: ID ресурсов
+        resource_hours: Доступные часы ресурсов
+        task_ids: ID задач
+        task_required: Требуемые часы задач
+        task_priority: Приоритеты задач (1 - высший, 5 - низший)
+        resource_types: Коды типов ресурсов (известные типы - по TYPE_IDS)
+        type_names: Названия типов ресурсов в порядке первого появления
+        type_groups: Индексы ресурсов каждого типа (по коду типа)
+        task_titles: Названия задач в нижнем регистре
+        total_required: Суммарные требуемые часы задач
+        total_available: Суммарные доступные часы ресурсов
+    """
+    resource_ids: np.ndarray
+    resource_hours: np.ndarray
+    task_ids: np.ndarray
+    task_required: np.ndarray
+    task_priority: np.ndarray
+    resource_types: np.ndarray
+    type_names: List[str]
+    type_groups: List[np.ndarray]
+    task_titles: List[str]
+    total_required: float
+    total_available: float
+
+
+def _to_soa(resources: List[Resource], tasks: List[Task]) -> _AllocationInput:
+    """
+    Однократное преобразование списков ORM-объектов в массивы NumPy.
+    Здесь же один раз группируются ресурсы по типам.
+    
+    Args:
+        resources: Список ресурсов
+        tasks: Список задач
+        
+    Returns:
+        _AllocationInput: Массивы с данными ресурсов и задач
+    """
+    # Известные типы кодируются по TYPE_IDS, остальные - следующими номерами.
+    # Названия присутствующих типов запоминаются в порядке первого появления
+    # (в этом порядке типы перечисляются в пояснении к альтернативе)
+    type_codes = dict(TYPE_IDS)
+    present_types = {}
+    resource_types = np.array(
+        [
+            present_types.setdefault(r.type, type_codes.setdefault(r.type, len(type_codes)))
+            for r in resources
+        ],
+        dtype=np.int32
+    )
+    
+    resource_hours = np.array([r.available_hours for r in resources], dtype=np.float64)
+    task_required = np.array([t.required_hours for t in tasks], dtype=np.float64)
+    
+    return _AllocationInput(
+        resource_ids=np.array([r.id for r in resources], dtype=np.int32),
+        resource_hours=resource_hours,
+        task_ids=np.array([t.id for t in tasks], dtype=np.int32),
+        task_required=task_required,
+        task_priority=np.array([t.priority for t in tasks], dtype=np.int32),
+        resource_types=resource_types,
+        type_names=list(present_types),
+        type_groups=[np.flatnonzero(resource_types == code) for code in range(len(type_codes))],
+        task_titles=[t.title.lower() for t in tasks],
+        total_required=float(task_required.sum()),
+        total_available=float(resource_hours.sum())
+    )
+
+
+def _to_allocations(
+    data: _AllocationInput,
+    r_idx: np.ndarray,
+    t_idx: np.ndarray,
+    hours: np.ndarray
+) -> np.ndarray:
+    """
+    Преобразование результата вычислительного ядра (индексы и часы) в массив записей.
+    Список словарей строится только один раз - в generate_alternatives.
+    
+    Args:
+        data: Ресурсы и задачи в виде массивов
+        r_idx: Индексы ресурсов
+        t_idx: Индексы задач
+        hours: Выделенные часы
+        
+    Returns:
+        np.ndarray: Массив записей с полями resource_id, task_id, hours
+    """
+    records = np.empty(len(hours), dtype=ALLOCATION_DTYPE)
+    records["resource_id"] = data.resource_ids[r_idx]
+    records["task_id"] = data.task_ids[t_idx]
+    records["hours"] = hours
+    return records
+
+
+def _to_dicts(records: np.ndarray) -> List[Dict]:
+    """
+    Преобразование массива записей в публичный формат распределений.
+    
+    Args:
+        records: Массив записей с полями resource_id, task_id, hours
+        
+    Returns:
+        List[Dict]: Список распределений [{"resource_id": int, "task_id": int, "hours": float}]
+    """
+    return [
+        {"resource_id": resource_id, "task_id": task_id, "hours": round(h, 1)}
+        for resource_id, task_id, h in zip(
+            records["resource_id"].tolist(),
+            records["task_id"].tolist(),
+            records["hours"].tolist()
+        )
+    ]
+
+
+def _find_suitable_types(task_title_lower: str) -> List[int]:
+    """
+    Поиск типов ресурсов, подходящих задаче по ключевым словам в названии.
+    
+    Args:
+        task_title_lower: Название задачи в нижнем регистре
+        
+    Returns:
+        List[int]: Коды подходящих типов (TYPE_IDS) в порядке TYPE_MATCHING
+    """
+    if _keyword_automaton is not None:
+        return sorted({code for _, code in _keyword_automaton.iter(task_title_lower)})
+    
+    return [
+        TYPE_IDS[resource_type]
+        for resource_type, keywords in TYPE_MATCHING.items()
+        if any(keyword in task_title_lower for keyword in keywords)
+    ]
 
 
 def generate_alternatives(
@@ -38,30 +228,24 @@ def generate_alternatives(
     if not resources or not tasks:
         return alternatives
     
-    # Альтернатива 1: Распределение по приоритету задач
-    alt1 = _priority_based_allocation(resources, tasks)
-    if alt1:
-        alternatives.append(alt1)
-    
-    # Альтернатива 2: Равномерное распределение ресурсов
-    alt2 = _balanced_allocation(resources, tasks)
-    if alt2:
-        alternatives.append(alt2)
-    
-    # Альтернатива 3: Распределение с учетом специализации ресурсов
-    alt3 = _specialization_based_allocation(resources, tasks)
-    if alt3:
-        alternatives.append(alt3)
-    
-    # Альтернатива 4: Минимизация перегрузки ресурсов
-    alt4 = _minimize_overload_allocation(resources, tasks)
-    if alt4:
-        alternatives.append(alt4)
-    
-    # Альтернатива 5: Жадный алгоритм с оптимизацией
-    alt5 = _greedy_optimized_allocation(resources, tasks)
-    if alt5:
-        alternatives.append(alt5)
+    # Один раз переводим входные данные в массивы для всех алгоритмов
+    data = _to_soa(resources, tasks)
+    
+    # Алгоритмы независимы и только читают входные массивы, поэтому выполняются
+    # параллельно: ядра Numba отпускают GIL (nogil=True). Результаты собираются
+    # в исходном порядке альтернатив.
+    allocators = (
+        _priority_based_allocation,        # 1: По приоритету задач
+        _balanced_allocation,              # 2: Равномерное распределение ресурсов
+        _specialization_based_allocation,  # 3: С учетом специализации ресурсов
+        _minimize_overload_allocation,     # 4: Минимизация перегрузки ресурсов
+        _greedy_optimized_allocation       # 5: Жадный алгоритм с оптимизацией
+    )
+    futures = [_executor.submit(allocator, data) for allocator in allocators]
+    for future in futures:
+        alt = future.result()
+        if alt:
+            alternatives.append(alt)
     
     # Удаляем дубликаты и нормализуем распределения
     alternatives = _remove_duplicates(alternatives)
@@ -70,85 +254,56 @@ def generate_alternatives(
     # Сортируем по баллу (лучшие первыми)
     alternatives.sort(key=lambda x: x["score"], reverse=True)
     
+    # Переводим распределения в публичный формат
+    for alt in alternatives:
+        alt["allocations"] = _to_dicts(alt["allocations"])
+    
     return alternatives
 
 
-def _priority_based_allocation(
-    resources: List[Resource],
-    tasks: List[Task]
-) -> Dict:
+def _priority_based_allocation(data: _AllocationInput) -> Dict:
     """
     Альтернатива 1: Распределение ресурсов по приоритету задач.
     Высокоприоритетные задачи получают ресурсы в первую очередь.
     
     Args:
-        resources: Список ресурсов
-        tasks: Список задач
+        data: Ресурсы и задачи в виде массивов
         
     Returns:
         Dict: Альтернатива с пояснением, баллом и распределениями
     """
     # Сортируем задачи по приоритету (1 - высший, 5 - низший)
-    sorted_tasks = sorted(tasks, key=lambda t: t.priority)
-    
-    # Создаем копии для отслеживания оставшихся часов
-    resource_hours = {r.id: r.available_hours for r in resources}
-    task_requirements = {t.id: t.required_hours for t in tasks}
-    
-    allocations = []
-    total_allocated = 0
+    task_order = np.argsort(data.task_priority, kind="stable")
     
     # Распределяем ресурсы, начиная с высокоприоритетных задач
-    for task in sorted_tasks:
-        remaining_need = task_requirements[task.id]
-        
-        # Пытаемся распределить ресурсы на эту задачу
-        for resource in resources:
-            if remaining_need <= 0:
-                break
-            
-            if resource_hours[resource.id] > 0:
-                # Выделяем часы на задачу
-                hours_to_allocate = min(remaining_need, resource_hours[resource.id])
-                allocations.append({
-                    "resource_id": resource.id,
-                    "task_id": task.id,
-                    "hours": hours_to_allocate
-                })
-                resource_hours[resource.id] -= hours_to_allocate
-                remaining_need -= hours_to_allocate
-                total_allocated += hours_to_allocate
+    # (ядро работает с копией оставшихся часов)
+    # Загрузка ресурсов и покрытие задач накапливаются в том же проходе
+    r_idx, t_idx, hours, resource_allocated, task_allocated = fill_tasks_kernel(
+        data.resource_hours.copy(), data.task_required, task_order
+    )
+    allocations = _to_allocations(data, r_idx, t_idx, hours)
+    total_allocated = float(task_allocated.sum())
     
     # Вычисляем балл: учитываем покрытие задач и приоритеты
-    total_required = sum(t.required_hours for t in tasks)
+    total_required = data.total_required
     coverage = total_allocated / total_required if total_required > 0 else 0
     
     # Бонус за покрытие высокоприоритетных задач
-    priority_coverage = {}
-    for alloc in allocations:
-        task_id = alloc["task_id"]
-        if task_id not in priority_coverage:
-            priority_coverage[task_id] = 0.0
-        priority_coverage[task_id] += alloc["hours"]
-    
-    priority_bonus = sum(
-        (6 - t.priority) * min(1.0, priority_coverage.get(t.id, 0) / t.required_hours)
-        for t in sorted_tasks
-    ) / len(tasks) if tasks else 0
+    priority_bonus = _priority_coverage(data, task_allocated)
     
     # Штраф за перегрузку ресурсов
-    overload_penalty = sum(
-        max(0, sum(a["hours"] for a in allocations if a["resource_id"] == r.id) - r.available_hours)
-        for r in resources
+    overload_penalty = float(
+        np.maximum(0.0, resource_allocated - data.resource_hours).sum()
     ) / total_required if total_required > 0 else 0
     
     score = coverage * 50 + priority_bonus * 20 - overload_penalty * 30
     score = max(0, score)  # Не даем отрицательный балл
     
+    top_priority = int(data.task_priority[task_order[0]]) if len(task_order) else 'N/A'
     explanation = (
         f"Распределение по приоритету задач. Высокоприоритетные задачи получают ресурсы первыми. "
         f"Покрыто {coverage*100:.1f}% требуемых часов. "
-        f"Приоритет отдается задачам с приоритетом 1-{sorted_tasks[0].priority if sorted_tasks else 'N/A'}."
+        f"Приоритет отдается задачам с приоритетом 1-{top_priority}."
     )
     
     return {
@@ -158,78 +313,43 @@ def _priority_based_allocation(
     }
 
 
-def _balanced_allocation(
-    resources: List[Resource],
-    tasks: List[Task]
-) -> Dict:
+def _balanced_allocation(data: _AllocationInput) -> Dict:
     """
     Альтернатива 2: Равномерное распределение ресурсов по задачам.
     Каждая задача получает пропорциональную долю доступных ресурсов.
     
     Args:
-        resources: Список ресурсов
-        tasks: Список задач
+        data: Ресурсы и задачи в виде массивов
         
     Returns:
         Dict: Альтернатива с пояснением, баллом и распределениями
     """
-    total_available = sum(r.available_hours for r in resources)
-    total_required = sum(t.required_hours for t in tasks)
+    total_available = data.total_available
+    total_required = data.total_required
     
     if total_available == 0 or total_required == 0:
         return None
     
-    # Вычисляем пропорцию для каждой задачи
-    task_proportions = {
-        t.id: t.required_hours / total_required
-        for t in tasks
-    }
-    
-    resource_hours = {r.id: r.available_hours for r in resources}
-    allocations = []
-    total_allocated = 0
+    # Вычисляем долю доступных часов для каждой задачи
+    task_shares = data.task_required / total_required * total_available
     
     # Распределяем ресурсы пропорционально потребностям задач
-    for task in tasks:
-        task_share = task_proportions[task.id] * total_available
-        allocated_to_task = 0
-        
-        for resource in resources:
-            if allocated_to_task >= task_share:
-                break
-            
-            if resource_hours[resource.id] > 0:
-                remaining_need = task_share - allocated_to_task
-                hours_to_allocate = min(remaining_need, resource_hours[resource.id])
-                
-                allocations.append({
-                    "resource_id": resource.id,
-                    "task_id": task.id,
-                    "hours": hours_to_allocate
-                })
-                resource_hours[resource.id] -= hours_to_allocate
-                allocated_to_task += hours_to_allocate
-                total_allocated += hours_to_allocate
+    r_idx, t_idx, hours, resource_allocated, task_allocated = fill_tasks_kernel(
+        data.resource_hours.copy(), task_shares, np.arange(len(data.task_ids))
+    )
+    allocations = _to_allocations(data, r_idx, t_idx, hours)
+    total_allocated = float(task_allocated.sum())
     
     # Балл основан на равномерности распределения
     coverage = total_allocated / total_required if total_required > 0 else 0
-    balance_score = 1.0 - _calculate_balance_variance(resources, allocations)
+    balance_score = 1.0 - _calculate_balance_variance(data, resource_allocated)
     
     # Проверяем равномерность покрытия задач
-    task_coverage = {}
-    for alloc in allocations:
-        if alloc["task_id"] not in task_coverage:
-            task_coverage[alloc["task_id"]] = 0.0
-        task_coverage[alloc["task_id"]] += alloc["hours"]
-    
     task_coverage_variance = 0.0
-    if tasks:
-        coverage_ratios = [
-            task_coverage.get(t.id, 0) / t.required_hours
-            for t in tasks
-        ]
-        mean_coverage = sum(coverage_ratios) / len(coverage_ratios)
-        task_coverage_variance = sum((r - mean_coverage) ** 2 for r in coverage_ratios) / len(coverage_ratios)
+    if len(data.task_ids):
+        coverage_ratios = task_allocated / data.task_required
+        mean_coverage = coverage_ratios.mean()
+        task_coverage_variance = float(((coverage_ratios - mean_coverage) ** 2).mean())
     
     fairness_score = 1.0 - min(1.0, task_coverage_variance)
     
@@ -249,121 +369,78 @@ def _balanced_allocation(
     }
 
 
-def _specialization_based_allocation(
-    resources: List[Resource],
-    tasks: List[Task]
-) -> Dict:
+def _specialization_based_allocation(data: _AllocationInput) -> Dict:
     """
     Альтернатива 3: Распределение с учетом специализации ресурсов.
     Улучшенный алгоритм: пытается сопоставить типы ресурсов с задачами на основе ключевых слов.
     
     Args:
-        resources: Список ресурсов
-        tasks: Список задач
+        data: Ресурсы и задачи в виде массивов
         
     Returns:
         Dict: Альтернатива с пояснением, баллом и распределениями
     """
-    # Группируем ресурсы по типам
-    resources_by_type = {}
-    for resource in resources:
-        if resource.type not in resources_by_type:
-            resources_by_type[resource.type] = []
-        resources_by_type[resource.type].append(resource)
-    
-    # Создаем словарь соответствий типов ресурсов и задач
-    type_matching = {
-        "разработчик": ["разработка", "код", "программирование", "функционал", "система"],
-        "дизайнер": ["дизайн", "интерфейс", "ui", "ux", "макет"],
-        "тестировщик": ["тестирование", "тест", "проверка", "qa"],
-        "аналитик": ["анализ", "требования", "документация", "исследование"],
-        "менеджер проекта": ["проект", "управление", "координация", "планирование"]
-    }
+    all_resources = np.arange(len(data.resource_ids))
     
-    resource_hours = {r.id: r.available_hours for r in resources}
-    task_requirements = {t.id: t.required_hours for t in tasks}
-    resource_allocated = {r.id: 0.0 for r in resources}
+    resource_hours = data.resource_hours.copy()
+    resource_allocated = np.zeros(len(data.resource_ids), dtype=np.float64)
     
-    allocations = []
+    r_parts, t_parts, h_parts = [], [], []
     total_allocated = 0
     type_matches = 0
     
-    # Сортируем задачи по приоритету
-    sorted_tasks = sorted(tasks, key=lambda t: (t.priority, -t.required_hours))
+    # Сортируем задачи по приоритету, затем по убыванию требуемых часов
+    task_order = np.lexsort((-data.task_required, data.task_priority))
     
-    for task in sorted_tasks:
-        remaining_need = task_requirements[task.id]
-        task_title_lower = task.title.lower()
-        
+    for t in task_order:
         # Находим подходящие типы ресурсов для задачи
-        suitable_types = []
-        for resource_type, keywords in type_matching.items():
-            if any(keyword in task_title_lower for keyword in keywords):
-                suitable_types.append(resource_type)
+        suitable_types = _find_suitable_types(data.task_titles[t])
         
         # Сначала пытаемся использовать подходящие типы ресурсов
-        resources_to_try = []
         if suitable_types:
-            for resource_type in suitable_types:
-                if resource_type in resources_by_type:
-                    resources_to_try.extend(resources_by_type[resource_type])
+            resources_to_try = np.concatenate([data.type_groups[code] for code in suitable_types])
         else:
             # Если нет подходящих типов, используем все ресурсы
-            resources_to_try = resources
+            resources_to_try = all_resources
         
         # Распределяем ресурсы на задачу
-        for resource in resources_to_try:
-            if remaining_need <= 0:
-                break
-            
-            if resource_hours[resource.id] > 0:
-                hours_to_allocate = min(remaining_need, resource_hours[resource.id])
-                allocations.append({
-                    "resource_id": resource.id,
-                    "task_id": task.id,
-                    "hours": hours_to_allocate
-                })
-                resource_hours[resource.id] -= hours_to_allocate
-                resource_allocated[resource.id] += hours_to_allocate
-                remaining_need -= hours_to_allocate
-                total_allocated += hours_to_allocate
-                
-                # Проверяем, было ли это совпадение по типу
-                if resource.type in suitable_types:
-                    type_matches += 1
+        idx, taken = fill_need(resource_hours, resources_to_try, data.task_required[t])
+        remaining_need = data.task_required[t] - taken.sum()
+        if suitable_types:
+            # Все распределения из подходящих типов - совпадения по специализации
+            type_matches += len(idx)
         
         # Если задача не полностью покрыта, используем остальные ресурсы
         if remaining_need > 0:
-            for resource in resources:
-                if remaining_need <= 0:
-                    break
-                if resource_hours[resource.id] > 0 and resource not in resources_to_try:
-                    hours_to_allocate = min(remaining_need, resource_hours[resource.id])
-                    allocations.append({
-                        "resource_id": resource.id,
-                        "task_id": task.id,
-                        "hours": hours_to_allocate
-                    })
-                    resource_hours[resource.id] -= hours_to_allocate
-                    resource_allocated[resource.id] += hours_to_allocate
-                    remaining_need -= hours_to_allocate
-                    total_allocated += hours_to_allocate
-    
-    total_required = sum(t.required_hours for t in tasks)
+            untried = np.ones(len(all_resources), dtype=bool)
+            untried[resources_to_try] = False
+            extra_idx, extra_taken = fill_need(resource_hours, all_resources[untried], remaining_need)
+            idx = np.concatenate((idx, extra_idx))
+            taken = np.concatenate((taken, extra_taken))
+        
+        r_parts.append(idx)
+        t_parts.append(np.full(len(idx), t))
+        h_parts.append(taken)
+        resource_allocated[idx] += taken
+        total_allocated += float(taken.sum())
+    
+    allocations = _to_allocations(
+        data, np.concatenate(r_parts), np.concatenate(t_parts), np.concatenate(h_parts)
+    )
+    
+    total_required = data.total_required
     coverage = total_allocated / total_required if total_required > 0 else 0
     
     # Балл учитывает покрытие, использование различных типов и совпадения
-    type_diversity = len(set(r.type for r in resources if any(
-        a["resource_id"] == r.id for a in allocations
-    )))
-    match_ratio = type_matches / len(allocations) if allocations else 0
+    type_diversity = len(np.unique(data.resource_types[resource_allocated > 0]))
+    match_ratio = type_matches / len(allocations) if len(allocations) else 0
     
-    score = coverage * 40 + (type_diversity / len(resources_by_type)) * 20 if resources_by_type else coverage * 40
+    score = coverage * 40 + (type_diversity / len(data.type_names)) * 20 if data.type_names else coverage * 40
     score += match_ratio * 15
     
     explanation = (
         f"Распределение с учетом специализации ресурсов. "
-        f"Учитываются типы ресурсов ({', '.join(resources_by_type.keys())}) "
+        f"Учитываются типы ресурсов ({', '.join(data.type_names)}) "
         f"для оптимального их использования. Покрыто {coverage*100:.1f}% требуемых часов. "
         f"Использовано {type_diversity} различных типов ресурсов. "
         f"Совпадение по специализации: {match_ratio*100:.1f}%."
@@ -376,87 +453,41 @@ def _specialization_based_allocation(
     }
 
 
-def _minimize_overload_allocation(
-    resources: List[Resource],
-    tasks: List[Task]
-) -> Dict:
+def _minimize_overload_allocation(data: _AllocationInput) -> Dict:
     """
     Альтернатива 4: Минимизация перегрузки ресурсов.
     Старается распределить нагрузку так, чтобы ни один ресурс не был перегружен.
     
     Args:
-        resources: Список ресурсов
-        tasks: Список задач
+        data: Ресурсы и задачи в виде массивов
         
     Returns:
         Dict: Альтернатива с пояснением, баллом и распределениями
     """
-    total_required = sum(t.required_hours for t in tasks)
-    total_available = sum(r.available_hours for r in resources)
+    total_required = data.total_required
+    total_available = data.total_available
     
     if total_available == 0:
         return None
     
     # Вычисляем идеальную нагрузку на ресурс
-    ideal_load_per_resource = total_required / len(resources) if resources else 0
-    
-    resource_hours = {r.id: r.available_hours for r in resources}
-    resource_allocated = {r.id: 0.0 for r in resources}
-    task_requirements = {t.id: t.required_hours for t in tasks}
-    
-    allocations = []
+    n_resources = len(data.resource_ids)
+    ideal_load_per_resource = total_required / n_resources if n_resources else 0
     
     # Сортируем задачи по приоритету и размеру
-    sorted_tasks = sorted(tasks, key=lambda t: (t.priority, -t.required_hours))
+    task_order = np.lexsort((-data.task_required, data.task_priority))
     
-    for task in sorted_tasks:
-        remaining_need = task_requirements[task.id]
-        
-        # Выбираем ресурсы с наименьшей текущей загрузкой
-        while remaining_need > 0:
-            # Находим ресурс с минимальной загрузкой, у которого еще есть свободные часы
-            available_resources = [
-                r for r in resources
-                if resource_hours[r.id] > 0 and resource_allocated[r.id] < ideal_load_per_resource * 1.2
-            ]
-            
-            if not available_resources:
-                # Если нет идеальных ресурсов, берем любой доступный
-                available_resources = [r for r in resources if resource_hours[r.id] > 0]
-            
-            if not available_resources:
-                break
-            
-            # Выбираем ресурс с минимальной загрузкой
-            best_resource = min(
-                available_resources,
-                key=lambda r: resource_allocated[r.id]
-            )
-            
-            hours_to_allocate = min(
-                remaining_need,
-                resource_hours[best_resource.id],
-                ideal_load_per_resource * 1.2 - resource_allocated[best_resource.id]
-            )
-            
-            if hours_to_allocate > 0:
-                allocations.append({
-                    "resource_id": best_resource.id,
-                    "task_id": task.id,
-                    "hours": hours_to_allocate
-                })
-                resource_hours[best_resource.id] -= hours_to_allocate
-                resource_allocated[best_resource.id] += hours_to_allocate
-                remaining_need -= hours_to_allocate
-    
-    total_allocated = sum(a["hours"] for a in allocations)
+    # Выбираем ресурсы с наименьшей текущей загрузкой, не превышая 120% идеальной нагрузки
+    r_idx, t_idx, hours, resource_allocated, task_allocated = minimize_overload_kernel(
+        data.resource_hours.copy(), data.task_required, task_order, ideal_load_per_resource * 1.2
+    )
+    allocations = _to_allocations(data, r_idx, t_idx, hours)
+    
+    total_allocated = float(task_allocated.sum())
     coverage = total_allocated / total_required if total_required > 0 else 0
     
     # Балл учитывает покрытие и равномерность загрузки
-    overload_penalty = sum(
-        max(0, resource_allocated[r.id] - r.available_hours)
-        for r in resources
-    )
+    overload_penalty = float(np.maximum(0, resource_allocated - data.resource_hours).sum())
     balance = 1.0 - (overload_penalty / total_required) if total_required > 0 else 1.0
     score = coverage * 40 + balance * 35
     
@@ -464,7 +495,7 @@ def _minimize_overload_allocation(
         f"Распределение с минимизацией перегрузки ресурсов. "
         f"Нагрузка распределяется равномерно, избегая перегрузки отдельных ресурсов. "
         f"Покрыто {coverage*100:.1f}% требуемых часов. "
-        f"Максимальная загрузка ресурса: {max(resource_allocated.values()):.1f} часов."
+        f"Максимальная загрузка ресурса: {resource_allocated.max():.1f} часов."
     )
     
     return {
@@ -475,120 +506,86 @@ def _minimize_overload_allocation(
 
 
 def _calculate_balance_variance(
-    resources: List[Resource],
-    allocations: List[Dict]
+    data: _AllocationInput,
+    resource_allocated: np.ndarray
 ) -> float:
     """
     Вычисление дисперсии загрузки ресурсов для оценки равномерности распределения.
     
     Args:
-        resources: Список ресурсов
-        allocations: Список распределений
+        data: Ресурсы и задачи в виде массивов
+        resource_allocated: Выделенные часы по каждому ресурсу
         
     Returns:
         float: Нормализованная дисперсия (0 - идеально равномерно, 1 - очень неравномерно)
     """
-    resource_load = {r.id: 0.0 for r in resources}
-    
-    for alloc in allocations:
-        resource_load[alloc["resource_id"]] += alloc["hours"]
-    
-    loads = [
-        resource_load[r.id] / r.available_hours if r.available_hours > 0 else 0
-        for r in resources
-    ]
-    
-    if not loads:
+    if len(resource_allocated) == 0:
         return 0.0
     
-    mean_load = sum(loads) / len(loads)
-    variance = sum((load - mean_load) ** 2 for load in loads) / len(loads)
+    available = data.resource_hours
+    loads = np.divide(
+        resource_allocated, available,
+        out=np.zeros_like(resource_allocated), where=available > 0
+    )
+    variance = float(((loads - loads.mean()) ** 2).mean())
     
     # Нормализуем к диапазону [0, 1]
     return min(1.0, variance)
 
 
-def _greedy_optimized_allocation(
-    resources: List[Resource],
-    tasks: List[Task]
-) -> Dict:
+def _priority_coverage(data: _AllocationInput, task_allocated: np.ndarray) -> float:
+    """
+    Средняя взвешенная по приоритету доля покрытия задач.
+    Вес задачи - (6 - приоритет), доля покрытия ограничена единицей.
+    
+    Args:
+        data: Ресурсы и задачи в виде массивов
+        task_allocated: Выделенные часы по задачам
+        
+    Returns:
+        float: Значение бонуса (0 при отсутствии задач)
+    """
+    if not len(data.task_ids):
+        return 0
+    
+    weights = 6 - data.task_priority
+    coverage_ratios = np.minimum(1.0, task_allocated / data.task_required)
+    return float((weights * coverage_ratios).mean())
+
+
+def _greedy_optimized_allocation(data: _AllocationInput) -> Dict:
     """
     Альтернатива 5: Жадный алгоритм с оптимизацией покрытия.
     Максимизирует покрытие задач, используя наиболее эффективные ресурсы.
     
     Args:
-        resources: Список ресурсов
-        tasks: Список задач
+        data: Ресурсы и задачи в виде массивов
         
     Returns:
         Dict: Альтернатива с пояснением, баллом и распределениями
     """
     # Сортируем задачи по приоритету и размеру (важные и большие первыми)
-    sorted_tasks = sorted(tasks, key=lambda t: (t.priority, -t.required_hours))
+    task_order = np.lexsort((-data.task_required, data.task_priority))
     
-    resource_hours = {r.id: r.available_hours for r in resources}
-    task_requirements = {t.id: t.required_hours for t in tasks}
-    resource_allocated = {r.id: 0.0 for r in resources}
-    
-    allocations = []
-    total_allocated = 0
+    # Жадный алгоритм: для каждой задачи берем ресурсы в порядке эффективности,
+    # распределения меньше 0.1 часа игнорируются
+    r_idx, t_idx, hours, resource_allocated, task_allocated = greedy_kernel(
+        data.resource_hours.copy(), data.task_required, task_order, 0.1
+    )
+    allocations = _to_allocations(data, r_idx, t_idx, hours)
+    total_allocated = float(task_allocated.sum())
     
-    # Жадный алгоритм: для каждой задачи выбираем лучший доступный ресурс
-    for task in sorted_tasks:
-        remaining_need = task_requirements[task.id]
-        
-        while remaining_need > 0:
-            # Находим ресурсы, которые могут помочь с этой задачей
-            available_resources = [
-                r for r in resources
-                if resource_hours[r.id] > 0.1  # Минимальный порог
-            ]
-            
-            if not available_resources:
-                break
-            
-            # Выбираем ресурс с максимальной эффективностью
-            # Эффективность = доступные часы / текущая загрузка (если загружен)
-            best_resource = max(
-                available_resources,
-                key=lambda r: (
-                    resource_hours[r.id] / max(resource_allocated[r.id], 1.0),
-                    resource_hours[r.id]  # При равной эффективности берем больше часов
-                )
-            )
-            
-            hours_to_allocate = min(
-                remaining_need,
-                resource_hours[best_resource.id]
-            )
-            
-            if hours_to_allocate > 0.1:  # Игнорируем очень маленькие распределения
-                allocations.append({
-                    "resource_id": best_resource.id,
-                    "task_id": task.id,
-                    "hours": hours_to_allocate
-                })
-                resource_hours[best_resource.id] -= hours_to_allocate
-                resource_allocated[best_resource.id] += hours_to_allocate
-                remaining_need -= hours_to_allocate
-                total_allocated += hours_to_allocate
-    
-    total_required = sum(t.required_hours for t in tasks)
+    total_required = data.total_required
     coverage = total_allocated / total_required if total_required > 0 else 0
     
     # Балл учитывает покрытие и эффективность использования ресурсов
-    efficiency = sum(
-        min(1.0, resource_allocated[r.id] / r.available_hours)
-        for r in resources
-        if r.available_hours > 0
-    ) / len(resources) if resources else 0
-    
-    priority_coverage = sum(
-        (6 - t.priority) * min(1.0, (task_requirements[t.id] - (task_requirements[t.id] - sum(
-            a["hours"] for a in allocations if a["task_id"] == t.id
-        ))) / task_requirements[t.id])
-        for t in sorted_tasks
-    ) / len(tasks) if tasks else 0
+    n_resources = len(data.resource_ids)
+    has_hours = data.resource_hours > 0
+    efficiency = float(
+        np.minimum(1.0, resource_allocated[has_hours] / data.resource_hours[has_hours]).sum()
+    ) / n_resources if n_resources else 0
+    
+    priority_coverage = _priority_coverage(data, task_allocated)
     
     score = coverage * 50 + efficiency * 25 + priority_coverage * 15
     
@@ -616,41 +613,26 @@ def _remove_duplicates(alternatives: List[Dict]) -> List[Dict]:
     Returns:
         List[Dict]: Список альтернатив без дубликатов
     """
-    seen = set()
-    unique_alternatives = []
+    # Для каждого набора распределений храним альтернативу с лучшим баллом
+    best = {}
     
     for alt in alternatives:
-        # Создаем уникальный ключ на основе распределений
-        allocations_key = tuple(
-            sorted(
-                (a["resource_id"], a["task_id"], round(a["hours"], 1))
-                for a in alt["allocations"]
-            )
-        )
+        # Ключ - байты отсортированного массива записей с часами, округленными до 0.1
+        rounded = alt["allocations"].copy()
+        rounded["hours"] = np.round(rounded["hours"], 1)
+        allocations_key = np.sort(rounded, order=["resource_id", "task_id", "hours"]).tobytes()
         
-        if allocations_key not in seen:
-            seen.add(allocations_key)
-            unique_alternatives.append(alt)
-        else:
-            # Если дубликат найден, оставляем альтернативу с лучшим баллом
-            for i, existing_alt in enumerate(unique_alternatives):
-                existing_key = tuple(
-                    sorted(
-                        (a["resource_id"], a["task_id"], round(a["hours"], 1))
-                        for a in existing_alt["allocations"]
-                    )
-                )
-                if existing_key == allocations_key and alt["score"] > existing_alt["score"]:
-                    unique_alternatives[i] = alt
-                    break
+        current = best.get(allocations_key)
+        if current is None or alt["score"] > current["score"]:
+            best[allocations_key] = alt
     
-    return unique_alternatives
+    return list(best.values())
 
 
 def _normalize_allocations(alternatives: List[Dict]) -> List[Dict]:
     """
-    Нормализация распределений: удаление очень маленьких распределений (< 0.5 часов)
-    и объединение распределений одного ресурса на одну задачу.
+    Нормализация распределений: объединение распределений одной пары (ресурс, задача)
+    с суммированием часов и удаление очень маленьких распределений (< 0.5 часов).
     
     Args:
         alternatives: Список альтернатив
@@ -661,26 +643,22 @@ def _normalize_allocations(alternatives: List[Dict]) -> List[Dict]:
     normalized = []
     
     for alt in alternatives:
-        # Группируем распределения по ресурсу и задаче
-        grouped = {}
-        for alloc in alt["allocations"]:
-            key = (alloc["resource_id"], alloc["task_id"])
-            if key not in grouped:
-                grouped[key] = 0.0
-            grouped[key] += alloc["hours"]
+        records = alt["allocations"]
+        
+        # Объединяем повторяющиеся пары (ресурс, задача) в порядке первого появления
+        _, first, inverse = np.unique(
+            records[["resource_id", "task_id"]], return_index=True, return_inverse=True
+        )
+        if len(first) < len(records):
+            merged_hours = np.bincount(inverse.ravel(), weights=records["hours"])
+            order = np.argsort(first)
+            records = records[first[order]]
+            records["hours"] = merged_hours[order]
         
-        # Создаем нормализованные распределения (убираем очень маленькие)
-        normalized_allocations = [
-            {
-                "resource_id": resource_id,
-                "task_id": task_id,
-                "hours": round(hours, 1)
-            }
-            for (resource_id, task_id), hours in grouped.items()
-            if hours >= 0.5  # Минимальный порог
-        ]
+        # Убираем очень маленькие распределения (минимальный порог)
+        normalized_allocations = records[records["hours"] >= 0.5]
         
-        if normalized_allocations:
+        if len(normalized_allocations):
             normalized.append({
                 "explanation": alt["explanation"],
                 "score": alt["score"],
@@ -688,8 +666,3 @@ def _normalize_allocations(alternatives: List[Dict]) -> List[Dict]:
             })
     
     return normalized
-
-
-
-
-
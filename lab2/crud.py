@@ -3,13 +3,191 @@ CRUD операции для работы с базой данных.
 Содержит функции для создания, чтения, обновления и удаления записей.
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List, Optional
+from sqlalchemy.orm import Session, lazyload, selectinload
+from sqlalchemy import bindparam, delete, desc, func, insert, select, true, update
+from typing import Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass
+import math
+import threading
+import time
+import numpy as np
 from models import Resource, Task, Alternative, Allocation, UserChoice
 from schemas import ResourceCreate, TaskCreate
 
 
+# ========== Кэш списков ресурсов и задач ==========
+
+# Время жизни кэша в секундах. Изменения через функции этого модуля сбрасывают кэш сразу,
+# TTL ограничивает устаревание при изменениях БД в обход модуля (другим процессом)
+CACHE_TTL_SECONDS = 30.0
+
+_cache_lock = threading.Lock()
+_list_cache: Dict[type, Tuple[float, List]] = {}
+_cache_versions: Dict[type, int] = {Resource: 0, Task: 0}
+
+# Счетчик изменений альтернатив. ID альтернатив переиспользуются после удаления,
+# поэтому кэши по ID альтернативы должны учитывать и этот счетчик
+_alternatives_version = 0
+
+
+def _get_all_cached(db: Session, model: type) -> List:
+    """
+    Получение всех записей модели с кэшированием на CACHE_TTL_SECONDS.
+    Закэшированные объекты отсоединены от сессии (expunge): их атрибуты уже загружены
+    и не сбрасываются при commit других сессий, поэтому объекты можно отдавать
+    в разные запросы только для чтения.
+    
+    Args:
+        db: Сессия базы данных
+        model: Класс модели (Resource или Task)
+        
+    Returns:
+        List: Список всех записей модели
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _list_cache.get(model)
+        version = _cache_versions[model]
+    if cached is not None and now - cached[0] < CACHE_TTL_SECONDS:
+        return list(cached[1])
+    
+    items = db.query(model).all()
+    for item in items:
+        db.expunge(item)
+    
+    with _cache_lock:
+        # Если во время запроса кэш сбросили, результат может быть устаревшим - не сохраняем его
+        if _cache_versions[model] == version:
+            _list_cache[model] = (now, items)
+    return list(items)
+
+
+def _invalidate_cache(model: type) -> None:
+    """
+    Сброс кэша списка записей модели после изменения данных.
+    
+    Args:
+        model: Класс модели (Resource или Task)
+    """
+    global _context_cache
+    with _cache_lock:
+        _list_cache.pop(model, None)
+        _cache_versions[model] += 1
+        _context_cache = None
+
+
+def _bump_alternatives_version() -> None:
+    """Отметка изменения альтернатив (создание или удаление)."""
+    global _alternatives_version
+    with _cache_lock:
+        _alternatives_version += 1
+
+
+def get_alternatives_version() -> int:
+    """
+    Счетчик изменений альтернатив через этот модуль (для ключей кэшей по ID альтернативы).
+    
+    Returns:
+        int: Текущее значение счетчика
+    """
+    with _cache_lock:
+        return _alternatives_version
+
+
+@dataclass
+class AllocationContext:
+    """
+    Ресурсы и задачи, подготовленные для расчетов по альтернативам.
+    Общий для запросов объект: используется только для чтения.
+    
+    Атрибуты:
+        resources: Список ресурсов
+        tasks: Список задач
+        resource_pos: Позиция ресурса в массивах по его ID
+        task_pos: Позиция задачи в массивах по ее ID
+        required: Требуемые часы задач
+        priority: Приоритеты задач
+        available: Доступные часы ресурсов
+        resource_names: Имена ресурсов по ID
+        task_titles: Названия задач по ID
+        version: Счетчики изменений ресурсов и задач, по которым построен контекст
+    """
+    resources: List[Resource]
+    tasks: List[Task]
+    resource_pos: Dict[int, int]
+    task_pos: Dict[int, int]
+    required: np.ndarray
+    priority: np.ndarray
+    available: np.ndarray
+    resource_names: Dict[int, str]
+    task_titles: Dict[int, str]
+    version: Tuple[int, int]
+    
+    def allocation_names(self, allocation: Allocation) -> Tuple[str, str]:
+        """
+        Имя ресурса и название задачи распределения без обращения к связям ORM.
+        Если ресурса или задачи нет в контексте (изменены в обход кэша),
+        они загружаются через связь.
+        
+        Args:
+            allocation: Распределение
+            
+        Returns:
+            Tuple[str, str]: Имя ресурса и название задачи
+        """
+        resource_name = self.resource_names.get(allocation.resource_id)
+        if resource_name is None:
+            resource_name = allocation.resource.name
+        task_title = self.task_titles.get(allocation.task_id)
+        if task_title is None:
+            task_title = allocation.task.title
+        return resource_name, task_title
+
+
+# Контекст строится из закэшированных списков и сбрасывается вместе с ними
+_context_cache: Optional[Tuple[float, Tuple[int, int], AllocationContext]] = None
+
+
+def get_allocation_context(db: Session) -> AllocationContext:
+    """
+    Получение ресурсов и задач вместе с индексами по ID и массивами NumPy.
+    Результат кэшируется так же, как списки ресурсов и задач (см. _get_all_cached).
+    
+    Args:
+        db: Сессия базы данных
+        
+    Returns:
+        AllocationContext: Подготовленные ресурсы и задачи
+    """
+    global _context_cache
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _context_cache
+        versions = (_cache_versions[Resource], _cache_versions[Task])
+    if cached is not None and cached[1] == versions and now - cached[0] < CACHE_TTL_SECONDS:
+        return cached[2]
+    
+    resources = get_all_resources(db)
+    tasks = get_all_tasks(db)
+    context = AllocationContext(
+        resources=resources,
+        tasks=tasks,
+        resource_pos={resource.id: i for i, resource in enumerate(resources)},
+        task_pos={task.id: i for i, task in enumerate(tasks)},
+        required=np.fromiter((t.required_hours for t in tasks), dtype=np.float64, count=len(tasks)),
+        priority=np.fromiter((t.priority for t in tasks), dtype=np.float64, count=len(tasks)),
+        available=np.fromiter((r.available_hours for r in resources), dtype=np.float64, count=len(resources)),
+        resource_names={resource.id: resource.name for resource in resources},
+        task_titles={task.id: task.title for task in tasks},
+        version=versions
+    )
+    
+    with _cache_lock:
+        if (_cache_versions[Resource], _cache_versions[Task]) == versions:
+            _context_cache = (now, versions, context)
+    return context
+
+
 # ========== Операции с ресурсами ==========
 
 def create_resource(db: Session, resource: ResourceCreate) -> Resource:
@@ -30,10 +208,28 @@ def create_resource(db: Session, resource: ResourceCreate) -> Resource:
     )
     db.add(db_resource)
     db.commit()
-    db.refresh(db_resource)
+    _invalidate_cache(Resource)
     return db_resource
 
 
+def bulk_create_resources(db: Session, resources: List[ResourceCreate]) -> int:
+    """
+    Пакетное создание ресурсов одним INSERT (executemany) и одной фиксацией.
+    
+    Args:
+        db: Сессия базы данных
+        resources: Данные ресурсов для создания
+        
+    Returns:
+        int: Количество созданных ресурсов
+    """
+    if resources:
+        db.execute(insert(Resource), [resource.model_dump() for resource in resources])
+        db.commit()
+        _invalidate_cache(Resource)
+    return len(resources)
+
+
 def get_resource(db: Session, resource_id: int) -> Optional[Resource]:
     """
     Получение ресурса по ID.
@@ -51,6 +247,7 @@ def get_resource(db: Session, resource_id: int) -> Optional[Resource]:
 def get_all_resources(db: Session) -> List[Resource]:
     """
     Получение всех ресурсов из базы данных.
+    Результат кэшируется (см. _get_all_cached).
     
     Args:
         db: Сессия базы данных
@@ -58,7 +255,7 @@ def get_all_resources(db: Session) -> List[Resource]:
     Returns:
         List[Resource]: Список всех ресурсов
     """
-    return db.query(Resource).all()
+    return _get_all_cached(db, Resource)
 
 
 def update_resource(
@@ -81,19 +278,20 @@ def update_resource(
     Returns:
         Resource или None, если ресурс не найден
     """
-    db_resource = get_resource(db, resource_id)
-    if not db_resource:
-        return None
-    
-    if name is not None:
-        db_resource.name = name
-    if type is not None:
-        db_resource.type = type
-    if available_hours is not None:
-        db_resource.available_hours = available_hours
+    values = {
+        field: value
+        for field, value in (("name", name), ("type", type), ("available_hours", available_hours))
+        if value is not None
+    }
+    if not values:
+        return get_resource(db, resource_id)
     
+    # Один UPDATE ... RETURNING вместо SELECT + UPDATE
+    db_resource = db.execute(
+        update(Resource).where(Resource.id == resource_id).values(**values).returning(Resource)
+    ).scalar_one_or_none()
     db.commit()
-    db.refresh(db_resource)
+    _invalidate_cache(Resource)
     return db_resource
 
 
@@ -108,13 +306,12 @@ def delete_resource(db: Session, resource_id: int) -> bool:
     Returns:
         bool: True если ресурс удален, False если не найден
     """
-    db_resource = get_resource(db, resource_id)
-    if not db_resource:
-        return False
-    
-    db.delete(db_resource)
+    # Распределения ссылаются на ресурс, поэтому удаляются вместе с ним (как в delete_all_resources)
+    db.execute(delete(Allocation).where(Allocation.resource_id == resource_id))
+    deleted = db.execute(delete(Resource).where(Resource.id == resource_id)).rowcount
     db.commit()
-    return True
+    _invalidate_cache(Resource)
+    return deleted > 0
 
 
 # ========== Операции с задачами ==========
@@ -137,10 +334,28 @@ def create_task(db: Session, task: TaskCreate) -> Task:
     )
     db.add(db_task)
     db.commit()
-    db.refresh(db_task)
+    _invalidate_cache(Task)
     return db_task
 
 
+def bulk_create_tasks(db: Session, tasks: List[TaskCreate]) -> int:
+    """
+    Пакетное создание задач одним INSERT (executemany) и одной фиксацией.
+    
+    Args:
+        db: Сессия базы данных
+        tasks: Данные задач для создания
+        
+    Returns:
+        int: Количество созданных задач
+    """
+    if tasks:
+        db.execute(insert(Task), [task.model_dump() for task in tasks])
+        db.commit()
+        _invalidate_cache(Task)
+    return len(tasks)
+
+
 def get_task(db: Session, task_id: int) -> Optional[Task]:
     """
     Получение задачи по ID.
@@ -158,6 +373,7 @@ def get_task(db: Session, task_id: int) -> Optional[Task]:
 def get_all_tasks(db: Session) -> List[Task]:
     """
     Получение всех задач из базы данных.
+    Результат кэшируется (см. _get_all_cached).
     
     Args:
         db: Сессия базы данных
@@ -165,7 +381,7 @@ def get_all_tasks(db: Session) -> List[Task]:
     Returns:
         List[Task]: Список всех задач
     """
-    return db.query(Task).all()
+    return _get_all_cached(db, Task)
 
 
 def update_task(
@@ -188,19 +404,20 @@ def update_task(
     Returns:
         Task или None, если задача не найдена
     """
-    db_task = get_task(db, task_id)
-    if not db_task:
-        return None
-    
-    if title is not None:
-        db_task.title = title
-    if required_hours is not None:
-        db_task.required_hours = required_hours
-    if priority is not None:
-        db_task.priority = priority
+    values = {
+        field: value
+        for field, value in (("title", title), ("required_hours", required_hours), ("priority", priority))
+        if value is not None
+    }
+    if not values:
+        return get_task(db, task_id)
     
+    # Один UPDATE ... RETURNING вместо SELECT + UPDATE
+    db_task = db.execute(
+        update(Task).where(Task.id == task_id).values(**values).returning(Task)
+    ).scalar_one_or_none()
     db.commit()
-    db.refresh(db_task)
+    _invalidate_cache(Task)
     return db_task
 
 
@@ -215,13 +432,12 @@ def delete_task(db: Session, task_id: int) -> bool:
     Returns:
         bool: True если задача удалена, False если не найдена
     """
-    db_task = get_task(db, task_id)
-    if not db_task:
-        return False
-    
-    db.delete(db_task)
+    # Распределения ссылаются на задачу, поэтому удаляются вместе с ней (как в delete_all_tasks)
+    db.execute(delete(Allocation).where(Allocation.task_id == task_id))
+    deleted = db.execute(delete(Task).where(Task.id == task_id)).rowcount
     db.commit()
-    return True
+    _invalidate_cache(Task)
+    return deleted > 0
 
 
 # ========== Операции с альтернативами ==========
@@ -252,24 +468,79 @@ def create_alternative(
     db.add(db_alternative)
     db.flush()  # Получаем ID альтернативы
     
-    # Создаем распределения ресурсов
-    for alloc_data in allocations:
-        db_allocation = Allocation(
-            alternative_id=db_alternative.id,
-            resource_id=alloc_data["resource_id"],
-            task_id=alloc_data["task_id"],
-            hours=alloc_data["hours"]
-        )
-        db.add(db_allocation)
+    # Создаем распределения ресурсов одним пакетным INSERT (executemany)
+    if allocations:
+        db.execute(insert(Allocation), [
+            {
+                "alternative_id": db_alternative.id,
+                "resource_id": alloc_data["resource_id"],
+                "task_id": alloc_data["task_id"],
+                "hours": alloc_data["hours"]
+            }
+            for alloc_data in allocations
+        ])
     
     db.commit()
-    db.refresh(db_alternative)
+    _bump_alternatives_version()
     return db_alternative
 
 
+def create_alternatives(db: Session, alternatives_data: List[dict]) -> List[int]:
+    """
+    Пакетное создание альтернатив с распределениями в одной транзакции.
+    Вставка идет через Core без создания ORM-объектов: альтернативы - одним
+    пакетным INSERT ... RETURNING id, распределения всех альтернатив - одним
+    пакетным INSERT.
+
+    Args:
+        db: Сессия базы данных
+        alternatives_data: Список словарей альтернатив:
+                           [{"explanation": str, "score": float, "allocations": [...]}, ...]
+
+    Returns:
+        List[int]: ID созданных альтернатив в порядке передачи
+    """
+    if not alternatives_data:
+        return []
+
+    alternative_ids = db.execute(
+        insert(Alternative).returning(Alternative.id, sort_by_parameter_order=True),
+        [
+            {"explanation": alt_data["explanation"], "score": alt_data["score"]}
+            for alt_data in alternatives_data
+        ]
+    ).scalars().all()
+
+    allocation_rows = [
+        {
+            "alternative_id": alternative_id,
+            "resource_id": alloc_data["resource_id"],
+            "task_id": alloc_data["task_id"],
+            "hours": alloc_data["hours"]
+        }
+        for alternative_id, alt_data in zip(alternative_ids, alternatives_data)
+        for alloc_data in alt_data["allocations"]
+    ]
+    if allocation_rows:
+        db.execute(insert(Allocation), allocation_rows)
+
+    db.commit()
+    _bump_alternatives_version()
+    return list(alternative_ids)
+
+
+# Жадная загрузка распределений альтернативы. Имена ресурсов и названия задач
+# берутся из AllocationContext, поэтому связи resource/task заранее не загружаются
+_ALTERNATIVE_LOAD_OPTIONS = (
+    selectinload(Alternative.allocations),
+)
+
+
 def get_all_alternatives(db: Session) -> List[Alternative]:
     """
     Получение всех альтернатив, отсортированных по баллу (лучшие первыми).
+    Распределения загружаются заранее одним дополнительным запросом
+    (без N+1 запросов при обходе alt.allocations).
     
     Args:
         db: Сессия базы данных
@@ -277,7 +548,76 @@ def get_all_alternatives(db: Session) -> List[Alternative]:
     Returns:
         List[Alternative]: Список альтернатив, отсортированный по убыванию score
     """
-    return db.query(Alternative).order_by(desc(Alternative.score)).all()
+    return (
+        db.query(Alternative)
+        .options(*_ALTERNATIVE_LOAD_OPTIONS)
+        .order_by(desc(Alternative.score))
+        .all()
+    )
+
+
+def get_alternatives_page(
+    db: Session,
+    limit: int,
+    cursor: Optional[int] = None
+) -> List[Alternative]:
+    """
+    Получение страницы альтернатив (keyset-пагинация по ID).
+    В отличие от OFFSET стоимость запроса не зависит от номера страницы:
+    следующая страница начинается сразу после последнего полученного ID.
+    
+    Args:
+        db: Сессия базы данных
+        limit: Максимальное количество альтернатив на странице
+        cursor: ID последней альтернативы предыдущей страницы (None - с начала)
+        
+    Returns:
+        List[Alternative]: Альтернативы страницы в порядке возрастания ID
+    """
+    query = db.query(Alternative).options(*_ALTERNATIVE_LOAD_OPTIONS)
+    if cursor is not None:
+        query = query.filter(Alternative.id > cursor)
+    return query.order_by(Alternative.id).limit(limit).all()
+
+
+def get_all_alternatives_dicts(db: Session) -> List[dict]:
+    """
+    Получение всех альтернатив (лучшие первыми) в виде словарей формата
+    AlternativeResponse одним запросом с JOIN, без создания ORM-объектов.
+    
+    Args:
+        db: Сессия базы данных
+        
+    Returns:
+        List[dict]: Альтернативы с распределениями (ID и названия ресурсов и задач, часы)
+    """
+    rows = db.execute(
+        select(
+            Alternative.id, Alternative.explanation, Alternative.score,
+            Allocation.resource_id, Resource.name, Allocation.task_id, Task.title, Allocation.hours
+        )
+        .select_from(Alternative)
+        .outerjoin(Allocation, Allocation.alternative_id == Alternative.id)
+        .outerjoin(Resource, Resource.id == Allocation.resource_id)
+        .outerjoin(Task, Task.id == Allocation.task_id)
+        .order_by(desc(Alternative.score), Alternative.id, Allocation.id)
+    )
+    
+    alternatives = []
+    current = None
+    for alt_id, explanation, score, resource_id, resource_name, task_id, task_title, hours in rows:
+        if current is None or current["id"] != alt_id:
+            current = {"id": alt_id, "explanation": explanation, "score": score, "allocations": []}
+            alternatives.append(current)
+        if resource_id is not None:
+            current["allocations"].append({
+                "resource_id": resource_id,
+                "resource_name": resource_name,
+                "task_id": task_id,
+                "task_title": task_title,
+                "hours": hours
+            })
+    return alternatives
 
 
 def delete_all_alternatives(db: Session) -> None:
@@ -289,13 +629,11 @@ def delete_all_alternatives(db: Session) -> None:
     Args:
         db: Сессия базы данных
     """
-    # Сначала удаляем все распределения
-    db.query(Allocation).delete()
-    db.commit()
-    
-    # Затем удаляем альтернативы
-    db.query(Alternative).delete()
+    # Сначала удаляем все распределения, затем альтернативы (в одной транзакции)
+    db.execute(delete(Allocation))
+    db.execute(delete(Alternative))
     db.commit()
+    _bump_alternatives_version()
 
 
 def delete_all_resources(db: Session) -> int:
@@ -309,13 +647,13 @@ def delete_all_resources(db: Session) -> int:
     Returns:
         int: Количество удаленных ресурсов
     """
-    # Сначала удаляем все распределения, связанные с ресурсами
-    db.query(Allocation).delete()
-    db.commit()
+    # Сначала удаляем все распределения, связанные с ресурсами (в той же транзакции)
+    db.query(Allocation).delete(synchronize_session=False)
     
-    count = db.query(Resource).count()
-    db.query(Resource).delete()
+    # DELETE сам возвращает количество удаленных строк
+    count = db.query(Resource).delete(synchronize_session=False)
     db.commit()
+    _invalidate_cache(Resource)
     return count
 
 
@@ -330,13 +668,13 @@ def delete_all_tasks(db: Session) -> int:
     Returns:
         int: Количество удаленных задач
     """
-    # Сначала удаляем все распределения, связанные с задачами
-    db.query(Allocation).delete()
-    db.commit()
+    # Сначала удаляем все распределения, связанные с задачами (в той же транзакции)
+    db.query(Allocation).delete(synchronize_session=False)
     
-    count = db.query(Task).count()
-    db.query(Task).delete()
+    # DELETE сам возвращает количество удаленных строк
+    count = db.query(Task).delete(synchronize_session=False)
     db.commit()
+    _invalidate_cache(Task)
     return count
 
 
@@ -383,21 +721,55 @@ def save_user_choice(
     )
     db.add(choice)
     db.commit()
-    db.refresh(choice)
     return choice
 
 
-def get_all_user_choices(db: Session) -> List[UserChoice]:
+def save_user_choices_bulk(db: Session, choices: List[dict]) -> int:
+    """
+    Пакетное сохранение выборов пользователя (например, при импорте истории для обучения).
+    Все записи вставляются одним INSERT (executemany) в одной транзакции.
+    
+    Args:
+        db: Сессия базы данных
+        choices: Список словарей с полями UserChoice (alternative_id, coverage, priority_score,
+                 balance_score, overload_penalty, total_score, num_resources, num_tasks;
+                 ml_score и selected_at - опционально)
+        
+    Returns:
+        int: Количество сохраненных выборов
+    """
+    if choices:
+        db.execute(insert(UserChoice), choices)
+        db.commit()
+    return len(choices)
+
+
+def iter_all_user_choices(db: Session, batch_size: int = 500) -> Iterator[UserChoice]:
     """
-    Получение всех выборов пользователя для обучения ML модели.
+    Потоковое получение всех выборов пользователя для обучения ML модели.
+    Записи читаются из БД пачками по batch_size (yield_per), а не загружаются целиком.
     
     Args:
         db: Сессия базы данных
+        batch_size: Размер пачки
         
     Returns:
-        List[UserChoice]: Список всех выборов
+        Iterator[UserChoice]: Итератор по выборам (новые первыми)
     """
-    return db.query(UserChoice).order_by(desc(UserChoice.selected_at)).all()
+    return db.query(UserChoice).order_by(desc(UserChoice.selected_at)).yield_per(batch_size)
+
+
+def count_user_choices(db: Session) -> int:
+    """
+    Количество сохраненных выборов пользователя.
+    
+    Args:
+        db: Сессия базы данных
+        
+    Returns:
+        int: Количество выборов
+    """
+    return db.query(func.count(UserChoice.id)).scalar()
 
 
 def clear_all_data(db: Session) -> dict:
@@ -412,27 +784,23 @@ def clear_all_data(db: Session) -> dict:
     Returns:
         dict: Статистика удаленных данных
     """
-    # Подсчитываем количество перед удалением
-    resources_count = db.query(Resource).count()
-    tasks_count = db.query(Task).count()
-    alternatives_count = db.query(Alternative).count()
-    
-    # Удаляем в правильном порядке:
+    # Удаляем в правильном порядке в одной транзакции (одна фиксация вместо четырех).
+    # Количество удаленных записей берется из результата DELETE, без отдельных COUNT.
     # 1. Сначала все распределения (Allocation) - они ссылаются на все остальное
-    db.query(Allocation).delete()
-    db.commit()
+    db.query(Allocation).delete(synchronize_session=False)
     
     # 2. Затем альтернативы
-    db.query(Alternative).delete()
-    db.commit()
+    alternatives_count = db.query(Alternative).delete(synchronize_session=False)
     
     # 3. Потом ресурсы
-    db.query(Resource).delete()
-    db.commit()
+    resources_count = db.query(Resource).delete(synchronize_session=False)
     
     # 4. И наконец задачи
-    db.query(Task).delete()
+    tasks_count = db.query(Task).delete(synchronize_session=False)
     db.commit()
+    _invalidate_cache(Resource)
+    _invalidate_cache(Task)
+    _bump_alternatives_version()
     
     return {
         "resources_deleted": resources_count,
@@ -445,6 +813,7 @@ def clear_all_data(db: Session) -> dict:
 def get_alternative(db: Session, alternative_id: int) -> Optional[Alternative]:
     """
     Получение альтернативы по ID.
+    Распределения загружаются заранее, как в get_all_alternatives.
     
     Args:
         db: Сессия базы данных
@@ -453,11 +822,101 @@ def get_alternative(db: Session, alternative_id: int) -> Optional[Alternative]:
     Returns:
         Alternative или None, если альтернатива не найдена
     """
-    return db.query(Alternative).filter(Alternative.id == alternative_id).first()
+    return (
+        db.query(Alternative)
+        .options(*_ALTERNATIVE_LOAD_OPTIONS)
+        .filter(Alternative.id == alternative_id)
+        .first()
+    )
 
 
 # ========== Статистика и аналитика ==========
 
+# Характеристики альтернативы, агрегированные на стороне БД (одна строка результата).
+# Стандартное отклонение загрузки считается в два прохода (среднее, затем дисперсия),
+# корень извлекается в Python: математические функции есть не во всех сборках SQLite
+_alternative_allocations = Allocation.alternative_id == bindparam("alternative_id")
+
+_per_task = (
+    select(Allocation.task_id, func.sum(Allocation.hours).label("hours"))
+    .where(_alternative_allocations)
+    .group_by(Allocation.task_id)
+    .cte("per_task")
+)
+_per_resource = (
+    select(Allocation.resource_id, func.sum(Allocation.hours).label("hours"))
+    .where(_alternative_allocations)
+    .group_by(Allocation.resource_id)
+    .cte("per_resource")
+)
+_resource_load = (
+    select(Resource.available_hours, func.coalesce(_per_resource.c.hours, 0.0).label("hours"))
+    .outerjoin(_per_resource, _per_resource.c.resource_id == Resource.id)
+    .cte("resource_load")
+)
+_utilization = (
+    select((_resource_load.c.hours / _resource_load.c.available_hours).label("value"))
+    .where(_resource_load.c.available_hours > 0)
+    .cte("utilization")
+)
+_mean_utilization = select(func.avg(_utilization.c.value).label("mean")).subquery("m")
+_utilization_deviation = _utilization.c.value - _mean_utilization.c.mean
+_task_coverage = func.min(1.0, func.coalesce(_per_task.c.hours, 0.0) / Task.required_hours)
+
+_ALTERNATIVE_SCORES_QUERY = select(
+    Alternative.score,
+    select(func.coalesce(func.sum(Allocation.hours), 0.0))
+    .where(_alternative_allocations)
+    .scalar_subquery(),
+    select(func.coalesce(func.sum(Task.required_hours), 0.0)).scalar_subquery(),
+    select(func.coalesce(func.avg(_task_coverage * (6 - Task.priority) / 5.0), 0.0))
+    .outerjoin(_per_task, _per_task.c.task_id == Task.id)
+    .scalar_subquery(),
+    select(func.count()).select_from(_utilization).scalar_subquery(),
+    select(func.avg(_utilization_deviation * _utilization_deviation))
+    .select_from(_utilization.join(_mean_utilization, true()))
+    .scalar_subquery(),
+    select(func.coalesce(func.sum(func.max(0.0, _resource_load.c.hours - _resource_load.c.available_hours)), 0.0))
+    .scalar_subquery(),
+    select(func.count()).select_from(Resource).scalar_subquery(),
+    select(func.count()).select_from(Task).scalar_subquery()
+).where(Alternative.id == bindparam("alternative_id"))
+
+
+def calculate_alternative_scores(db: Session, alternative_id: int) -> Optional[dict]:
+    """
+    Расчет характеристик альтернативы (покрытие, приоритетный бонус, равномерность,
+    перегрузка) агрегирующим запросом, без загрузки распределений в Python.
+    
+    Args:
+        db: Сессия базы данных
+        alternative_id: ID альтернативы
+        
+    Returns:
+        dict с характеристиками альтернативы или None, если альтернатива не найдена
+    """
+    row = db.execute(_ALTERNATIVE_SCORES_QUERY, {"alternative_id": alternative_id}).first()
+    if row is None:
+        return None
+    
+    (score, total_allocated, total_required, priority_score, n_utilizations,
+     utilization_variance, total_overload, num_resources, num_tasks) = row
+    
+    balance_score = 0.5
+    if n_utilizations > 0:
+        balance_score = max(0.0, min(1.0, 1.0 - math.sqrt(utilization_variance)))
+    
+    return {
+        "coverage": total_allocated / total_required if total_required > 0 else 0.0,
+        "priority_score": priority_score,
+        "balance_score": balance_score,
+        "overload_penalty": min(1.0, total_overload / total_required) if total_required > 0 else 0.0,
+        "total_score": score,
+        "num_resources": num_resources,
+        "num_tasks": num_tasks
+    }
+
+
 def calculate_distribution_stats(
     db: Session,
     alternative_id: Optional[int] = None
@@ -478,8 +937,13 @@ def calculate_distribution_stats(
     if alternative_id:
         alternative = get_alternative(db, alternative_id)
     else:
-        alternatives = get_all_alternatives(db)
-        alternative = alternatives[0] if alternatives else None
+        # Нужна только лучшая альтернатива, ее распределения здесь не загружаются
+        alternative = (
+            db.query(Alternative)
+            .options(lazyload(Alternative.allocations))
+            .order_by(desc(Alternative.score))
+            .first()
+        )
     
     if not alternative:
         return {
@@ -494,15 +958,21 @@ def calculate_distribution_stats(
             "warnings": ["Нет альтернатив для анализа"]
         }
     
-    # Статистика по ресурсам
-    resource_allocated = {r.id: 0.0 for r in resources}
-    for alloc in alternative.allocations:
-        resource_allocated[alloc.resource_id] += alloc.hours
+    # Статистика по ресурсам: суммы часов считаются в БД (GROUP BY), без загрузки распределений
+    resource_allocated = dict(
+        db.query(Allocation.resource_id, func.sum(Allocation.hours))
+        .filter(Allocation.alternative_id == alternative.id)
+        .group_by(Allocation.resource_id)
+        .all()
+    )
     
     resource_stats = []
     warnings = []
     
+    # Итоговые суммы накапливаются в тех же проходах, что и статистика
+    total_available = 0.0
     for resource in resources:
+        total_available += resource.available_hours
         allocated = resource_allocated.get(resource.id, 0.0)
         utilization = (allocated / resource.available_hours * 100) if resource.available_hours > 0 else 0
         overload = allocated > resource.available_hours
@@ -523,12 +993,17 @@ def calculate_distribution_stats(
         })
     
     # Статистика по задачам
-    task_allocated = {t.id: 0.0 for t in tasks}
-    for alloc in alternative.allocations:
-        task_allocated[alloc.task_id] += alloc.hours
+    task_allocated = dict(
+        db.query(Allocation.task_id, func.sum(Allocation.hours))
+        .filter(Allocation.alternative_id == alternative.id)
+        .group_by(Allocation.task_id)
+        .all()
+    )
     
     task_stats = []
+    total_required = 0.0
     for task in tasks:
+        total_required += task.required_hours
         allocated = task_allocated.get(task.id, 0.0)
         coverage = (allocated / task.required_hours * 100) if task.required_hours > 0 else 0
         
@@ -547,8 +1022,6 @@ def calculate_distribution_stats(
             "priority": task.priority
         })
     
-    total_available = sum(r.available_hours for r in resources)
-    total_required = sum(t.required_hours for t in tasks)
     total_allocated = sum(resource_allocated.values())
     overall_coverage = (total_allocated / total_required * 100) if total_required > 0 else 0
     
@@ -3,21 +3,52 @@
 Использует SQLAlchemy для работы с БД.
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 # Путь к файлу базы данных SQLite
 SQLALCHEMY_DATABASE_URL = "sqlite:///./sppr.db"
 
 # Создание движка SQLAlchemy
-# connect_args={"check_same_thread": False} необходим для работы SQLite в многопоточном режиме
+# connect_args={"check_same_thread": False} необходим для работы SQLite в многопоточном режиме.
+# Пул соединений: параллельные запросы (FastAPI выполняет синхронные endpoints в пуле потоков)
+# получают собственные соединения, а не ждут одно общее
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=10,
+    max_overflow=20,
+    pool_timeout=30
 )
 
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Настройка каждого нового соединения SQLite.
+    WAL позволяет читать параллельно с записью, synchronous=NORMAL в режиме WAL
+    сокращает число fsync при фиксации, временные данные и кэш страниц держатся в памяти.
+    
+    Args:
+        dbapi_connection: Соединение DB-API (sqlite3)
+        connection_record: Запись пула соединений
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 МБ
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 МБ
+    cursor.close()
+
+
 # Создание фабрики сессий для работы с БД
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: после commit объекты не сбрасываются, поэтому только что созданную
+# запись можно вернуть без повторного SELECT (ID и значения по умолчанию заполняются при flush)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Базовый класс для всех моделей
 Base = declarative_base()
@@ -44,6 +75,10 @@ def init_db():
     Вызывается при первом запуске приложения.
     """
     Base.metadata.create_all(bind=engine)
+    # create_all не добавляет новые индексы в уже существующие таблицы
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 
 
@@ -9,6 +9,9 @@ import json
 # Базовый URL API
 BASE_URL = "http://localhost:8000"
 
+# Одна сессия на все запросы: соединение с сервером переиспользуется (keep-alive)
+session = requests.Session()
+
 
 def print_response(response):
     """Красивый вывод ответа API."""
@@ -24,7 +27,7 @@ def print_response(response):
 print("=" * 80)
 print("Пример 1: Загрузка примерных данных")
 print("=" * 80)
-response = requests.post(f"{BASE_URL}/load-example-data")
+response = session.post(f"{BASE_URL}/load-example-data")
 print_response(response)
 
 
@@ -37,7 +40,7 @@ new_resource = {
     "type": "разработчик",
     "available_hours": 150.0
 }
-response = requests.post(
+response = session.post(
     f"{BASE_URL}/resource",
     json=new_resource
 )
@@ -53,7 +56,7 @@ new_task = {
     "required_hours": 90.0,
     "priority": 2
 }
-response = requests.post(
+response = session.post(
     f"{BASE_URL}/task",
     json=new_task
 )
@@ -64,7 +67,7 @@ print_response(response)
 print("\n" + "=" * 80)
 print("Пример 4: Получение списка всех ресурсов")
 print("=" * 80)
-response = requests.get(f"{BASE_URL}/resources")
+response = session.get(f"{BASE_URL}/resources")
 print_response(response)
 
 
@@ -72,7 +75,7 @@ print_response(response)
 print("\n" + "=" * 80)
 print("Пример 5: Получение списка всех задач")
 print("=" * 80)
-response = requests.get(f"{BASE_URL}/tasks")
+response = session.get(f"{BASE_URL}/tasks")
 print_response(response)
 
 
@@ -80,7 +83,7 @@ print_response(response)
 print("\n" + "=" * 80)
 print("Пример 6: Получение альтернатив распределения ресурсов")
 print("=" * 80)
-response = requests.get(f"{BASE_URL}/alternatives")
+response = session.get(f"{BASE_URL}/alternatives")
 print_response(response)
 
 # Выводим детали каждой альтернативы
@@ -3,42 +3,74 @@
 Содержит все API endpoints для работы с системой поддержки принятия решений.
 """
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import hashlib
+import io
+import json
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from database import get_db, init_db
 from schemas import (
     ResourceCreate, Resource, ResourceUpdate,
     TaskCreate, Task, TaskUpdate,
     AlternativesListResponse, AlternativeResponse, AllocationResponse,
-    DistributionStats, UserChoiceCreate, MLModelInfo
+    DistributionStats, UserChoiceCreate, MLModelInfo,
+    BatchRequest, BatchResponse, BatchSubRequest
 )
 from crud import (
-    create_resource, get_all_resources, get_resource,
+    create_resource, bulk_create_resources, get_all_resources, get_resource,
     update_resource, delete_resource,
-    create_task, get_all_tasks, get_task,
+    create_task, bulk_create_tasks, get_all_tasks, get_task,
     update_task, delete_task,
-    create_alternative, get_all_alternatives, get_alternative, delete_all_alternatives,
-    calculate_distribution_stats, clear_all_data,
-    save_user_choice, get_all_user_choices
+    create_alternatives, get_all_alternatives, get_all_alternatives_dicts,
+    get_alternatives_page, get_alternative, delete_all_alternatives,
+    calculate_distribution_stats, calculate_alternative_scores, clear_all_data,
+    save_user_choice, iter_all_user_choices, count_user_choices,
+    AllocationContext, get_allocation_context, get_alternatives_version
 )
 from algorithms import generate_alternatives
+from _ml_kernels_nb import score_alternative
 from example_data import get_example_resources, get_example_tasks
+from ml_recommender import AlternativeRecommender, FeatureContext, feature_context_from_arrays, get_recommender
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Управление жизненным циклом приложения.
-    Инициализирует базу данных при запуске.
+    Инициализирует базу данных и прогревает вычислительные ядра и ML модель при запуске.
     """
     # Инициализация при запуске
     init_db()
     print("База данных инициализирована")
+    # Прогрев ядра характеристик альтернатив, чтобы компиляция Numba
+    # не приходилась на первый запрос выбора альтернативы
+    empty = np.empty(0)
+    empty_idx = np.empty(0, dtype=np.int64)
+    score_alternative(empty, empty_idx, empty_idx, empty, empty, empty)
+    # Загрузка ML модели и прогрев предсказания до первого запроса.
+    # Ошибка модели не должна мешать запуску: рекомендации ML необязательны
+    try:
+        recommender = get_recommender()
+        if recommender.is_trained:
+            recommender.predict_proba({"allocations": []}, [], [])
+    except Exception as e:
+        print(f"Ошибка прогрева ML модели: {e}")
     yield
     # Очистка при завершении (если необходимо)
     pass
@@ -61,10 +93,99 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Сжатие ответов: JSON альтернатив и CSV экспорта хорошо сжимаются
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Подключение статических файлов (HTML, CSS, JS)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
+def _json_bytes(content) -> bytes:
+    """
+    Сериализация небольших ответов в JSON без проверки по схеме.
+    Используется в endpoints, которые сразу возвращают Response.
+    
+    Args:
+        content: Данные ответа (словари, списки, числа, строки)
+        
+    Returns:
+        bytes: JSON в кодировке UTF-8
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _make_etag(*parts) -> str:
+    """
+    Построение ETag по содержимому ответа.
+    
+    Args:
+        parts: Значения, однозначно определяющие содержимое ответа
+        
+    Returns:
+        str: ETag в кавычках (формат заголовка HTTP)
+    """
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+
+def _cache_headers(request: Request, etag: str) -> Tuple[dict, bool]:
+    """
+    Заголовки кэширования ответа и проверка условного запроса If-None-Match.
+    
+    Args:
+        request: HTTP запрос
+        etag: ETag текущего содержимого
+        
+    Returns:
+        Tuple[dict, bool]: Заголовки ETag/Cache-Control и признак того,
+        что у клиента уже актуальная версия (можно ответить 304)
+    """
+    # no-cache: клиент может хранить ответ, но перед использованием перепроверяет его
+    # по ETag, поэтому интерфейс сразу после изменения данных не показывает старый список
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    not_modified = False
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        not_modified = etag in tags or "*" in tags
+    return headers, not_modified
+
+
+# Пул для фоновых вычислений внутри запроса (генерация альтернатив, загрузка модели)
+_background_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="background")
+
+
+def allocation_context(db: Session = Depends(get_db)) -> AllocationContext:
+    """
+    Зависимость: ресурсы и задачи, подготовленные для расчетов по альтернативам.
+    Использует ту же сессию, что и endpoint.
+    
+    Args:
+        db: Сессия базы данных
+        
+    Returns:
+        AllocationContext: Подготовленные ресурсы и задачи
+    """
+    return get_allocation_context(db)
+
+
+def _feature_context(context: AllocationContext) -> FeatureContext:
+    """
+    Контекст признаков ML модели из уже подготовленных массивов AllocationContext.
+    
+    Args:
+        context: Ресурсы и задачи с индексами и массивами
+        
+    Returns:
+        FeatureContext: Контекст для расчета признаков
+    """
+    return feature_context_from_arrays(
+        context.task_pos, context.resource_pos, context.required, context.priority, context.available
+    )
+
+
 # ========== Endpoints для работы с ресурсами ==========
 
 @app.post("/resource", response_model=Resource, tags=["Ресурсы"])
@@ -83,17 +204,27 @@ def add_resource(resource: ResourceCreate, db: Session = Depends(get_db)):
 
 
 @app.get("/resources", response_model=List[Resource], tags=["Ресурсы"])
-def get_resources(db: Session = Depends(get_db)):
+def get_resources(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Получение списка всех ресурсов.
+    Поддерживает условные запросы: при совпадении If-None-Match возвращается 304.
     
     Args:
+        request: HTTP запрос
+        response: HTTP ответ (для заголовков кэширования)
         db: Сессия базы данных
         
     Returns:
         List[Resource]: Список всех ресурсов
     """
-    return get_all_resources(db)
+    resources = get_all_resources(db)
+    headers, not_modified = _cache_headers(request, _make_etag(
+        "resources", [(r.id, r.name, r.type, r.available_hours) for r in resources]
+    ))
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return resources
 
 
 @app.get("/resource/{resource_id}", response_model=Resource, tags=["Ресурсы"])
@@ -149,7 +280,7 @@ def update_resource_by_id(
     return resource
 
 
-@app.delete("/resource/{resource_id}", tags=["Ресурсы"])
+@app.delete("/resource/{resource_id}", response_class=Response, tags=["Ресурсы"])
 def delete_resource_by_id(resource_id: int, db: Session = Depends(get_db)):
     """
     Удаление ресурса по ID.
@@ -159,14 +290,17 @@ def delete_resource_by_id(resource_id: int, db: Session = Depends(get_db)):
         db: Сессия базы данных
         
     Returns:
-        dict: Сообщение об успешном удалении
+        Response: Сообщение об успешном удалении (JSON)
         
     Raises:
         HTTPException: Если ресурс не найден
     """
     if not delete_resource(db, resource_id):
         raise HTTPException(status_code=404, detail=f"Ресурс с ID {resource_id} не найден")
-    return {"message": f"Ресурс с ID {resource_id} успешно удален"}
+    return Response(
+        content=_json_bytes({"message": f"Ресурс с ID {resource_id} успешно удален"}),
+        media_type="application/json"
+    )
 
 
 # ========== Endpoints для работы с задачами ==========
@@ -187,17 +321,27 @@ def add_task(task: TaskCreate, db: Session = Depends(get_db)):
 
 
 @app.get("/tasks", response_model=List[Task], tags=["Задачи"])
-def get_tasks(db: Session = Depends(get_db)):
+def get_tasks(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Получение списка всех задач.
+    Поддерживает условные запросы: при совпадении If-None-Match возвращается 304.
     
     Args:
+        request: HTTP запрос
+        response: HTTP ответ (для заголовков кэширования)
         db: Сессия базы данных
         
     Returns:
         List[Task]: Список всех задач
     """
-    return get_all_tasks(db)
+    tasks = get_all_tasks(db)
+    headers, not_modified = _cache_headers(request, _make_etag(
+        "tasks", [(t.id, t.title, t.required_hours, t.priority) for t in tasks]
+    ))
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return tasks
 
 
 @app.get("/task/{task_id}", response_model=Task, tags=["Задачи"])
@@ -253,7 +397,7 @@ def update_task_by_id(
     return task
 
 
-@app.delete("/task/{task_id}", tags=["Задачи"])
+@app.delete("/task/{task_id}", response_class=Response, tags=["Задачи"])
 def delete_task_by_id(task_id: int, db: Session = Depends(get_db)):
     """
     Удаление задачи по ID.
@@ -263,20 +407,56 @@ def delete_task_by_id(task_id: int, db: Session = Depends(get_db)):
         db: Сессия базы данных
         
     Returns:
-        dict: Сообщение об успешном удалении
+        Response: Сообщение об успешном удалении (JSON)
         
     Raises:
         HTTPException: Если задача не найдена
     """
     if not delete_task(db, task_id):
         raise HTTPException(status_code=404, detail=f"Задача с ID {task_id} не найдена")
-    return {"message": f"Задача с ID {task_id} успешно удалена"}
+    return Response(
+        content=_json_bytes({"message": f"Задача с ID {task_id} успешно удалена"}),
+        media_type="application/json"
+    )
 
 
 # ========== Endpoints для работы с альтернативами ==========
 
+def _alternative_to_dict(alt, context: AllocationContext) -> dict:
+    """
+    Преобразование альтернативы из БД в словарь формата AlternativeResponse.
+    Имена ресурсов и названия задач берутся из контекста, а не через связи ORM.
+    
+    Args:
+        alt: Альтернатива с загруженными распределениями
+        context: Подготовленные ресурсы и задачи
+        
+    Returns:
+        dict: Альтернатива с распределениями
+    """
+    allocations = []
+    for alloc in alt.allocations:
+        resource_name, task_title = context.allocation_names(alloc)
+        allocations.append({
+            "resource_id": alloc.resource_id,
+            "resource_name": resource_name,
+            "task_id": alloc.task_id,
+            "task_title": task_title,
+            "hours": alloc.hours
+        })
+    return {
+        "id": alt.id,
+        "explanation": alt.explanation,
+        "score": alt.score,
+        "allocations": allocations
+    }
+
+
 @app.get("/alternatives", response_model=AlternativesListResponse, tags=["Альтернативы"])
-def get_alternatives(db: Session = Depends(get_db)):
+def get_alternatives(
+    db: Session = Depends(get_db),
+    context: AllocationContext = Depends(allocation_context)
+):
     """
     Получение списка альтернатив распределения ресурсов.
     
@@ -286,6 +466,7 @@ def get_alternatives(db: Session = Depends(get_db)):
     
     Args:
         db: Сессия базы данных
+        context: Ресурсы и задачи с индексами и массивами
         
     Returns:
         AlternativesListResponse: Список альтернатив с распределениями
@@ -293,9 +474,9 @@ def get_alternatives(db: Session = Depends(get_db)):
     Raises:
         HTTPException: Если нет ресурсов или задач в системе
     """
-    # Получаем все ресурсы и задачи
-    resources = get_all_resources(db)
-    tasks = get_all_tasks(db)
+    # Все ресурсы и задачи
+    resources = context.resources
+    tasks = context.tasks
     
     if not resources:
         raise HTTPException(
@@ -309,69 +490,54 @@ def get_alternatives(db: Session = Depends(get_db)):
             detail="В системе нет задач. Добавьте задачи через POST /task"
         )
     
-    # Удаляем старые альтернативы перед генерацией новых
+    # Генерация альтернатив и загрузка ML модели не зависят друг от друга и от БД,
+    # поэтому выполняются в фоне, пока удаляются старые альтернативы
+    generation = _background_executor.submit(generate_alternatives, resources, tasks)
+    recommender_loading = _background_executor.submit(get_recommender)
+    
+    # Удаляем старые альтернативы перед сохранением новых
     delete_all_alternatives(db)
     
-    # Генерируем новые альтернативы
-    alternatives_data = generate_alternatives(resources, tasks)
+    # Дожидаемся новых альтернатив
+    alternatives_data = generation.result()
     
-    # Сохраняем альтернативы в базу данных
-    for alt_data in alternatives_data:
-        create_alternative(
-            db=db,
-            explanation=alt_data["explanation"],
-            score=alt_data["score"],
-            allocations=alt_data["allocations"]
-        )
+    # Признаки для ML модели считаются один раз по сгенерированным альтернативам,
+    # рекомендации затем строятся по этой же матрице без повторного расчета
+    recommender = None
+    feature_ctx = None
+    X = None
+    try:
+        recommender = recommender_loading.result()
+        if recommender.is_trained:
+            feature_ctx = _feature_context(context)
+            X = recommender.extract_features_batch(alternatives_data, resources, tasks, ctx=feature_ctx)
+    except Exception as e:
+        print(f"Ошибка расчета признаков ML: {e}")
     
-    # Получаем сохраненные альтернативы с распределениями
-    db_alternatives = get_all_alternatives(db)
-    
-    # Формируем ответ
-    alternatives_response = []
-    alternatives_dict = []  # Для ML модели
-    
-    for alt in db_alternatives:
-        allocations_response = []
-        for alloc in alt.allocations:
-            allocations_response.append(AllocationResponse(
-                resource_id=alloc.resource_id,
-                resource_name=alloc.resource.name,
-                task_id=alloc.task_id,
-                task_title=alloc.task.title,
-                hours=alloc.hours
-            ))
-        
-        alt_response = AlternativeResponse(
-            id=alt.id,
-            explanation=alt.explanation,
-            score=alt.score,
-            allocations=allocations_response
-        )
-        alternatives_response.append(alt_response)
-        
-        # Подготавливаем данные для ML
-        alternatives_dict.append({
-            "id": alt.id,
-            "explanation": alt.explanation,
-            "score": alt.score,
-            "allocations": [
-                {
-                    "resource_id": alloc.resource_id,
-                    "task_id": alloc.task_id,
-                    "hours": alloc.hours
-                }
-                for alloc in alt.allocations
-            ]
-        })
+    # Сохраняем альтернативы в базу данных одной транзакцией
+    alternative_ids = create_alternatives(db, alternatives_data)
+    
+    # Получаем сохраненные альтернативы с распределениями одним запросом.
+    # Словари сразу подходят и для ответа, и для ML модели
+    # (она читает из распределений только ID и часы)
+    alternatives_dict = get_all_alternatives_dicts(db)
     
     # Получаем рекомендации от ML модели
     recommendations = None
     try:
-        from ml_recommender import AlternativeRecommender
-        recommender = AlternativeRecommender()
-        if recommender.is_trained:
-            ml_recommendations = recommender.recommend(alternatives_dict, resources, tasks)
+        if recommender is not None and recommender.is_trained:
+            # Строки матрицы признаков идут в порядке создания альтернатив,
+            # а альтернативы из БД - лучшие первыми
+            features = None
+            if X is not None:
+                row_by_id = {alternative_id: row for row, alternative_id in enumerate(alternative_ids)}
+                features = X[[row_by_id[alt["id"]] for alt in alternatives_dict]]
+            ml_recommendations = recommender.recommend(
+                alternatives_dict, resources, tasks,
+                data_version=(context.version, get_alternatives_version()),
+                features=features,
+                ctx=feature_ctx
+            )
             recommendations = [
                 {
                     "alternative_id": rec["alternative"]["id"],
@@ -383,21 +549,34 @@ def get_alternatives(db: Session = Depends(get_db)):
     except Exception as e:
         print(f"Ошибка получения рекомендаций ML: {e}")
     
-    return AlternativesListResponse(
-        alternatives=alternatives_response,
-        total=len(alternatives_response),
-        recommendations=recommendations
-    )
+    # Данные собраны из БД и ML модели, а не получены от клиента: ответ сериализуется
+    # сразу в JSON, без проверки по response_model (она создала бы Pydantic модель
+    # на каждое распределение). response_model остается для документации API
+    return Response(content=_json_bytes({
+        "alternatives": alternatives_dict,
+        "total": len(alternatives_dict),
+        "recommendations": recommendations
+    }), media_type="application/json")
 
 
 @app.get("/alternative/{alternative_id}", response_model=AlternativeResponse, tags=["Альтернативы"])
-def get_alternative_by_id(alternative_id: int, db: Session = Depends(get_db)):
+def get_alternative_by_id(
+    alternative_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    context: AllocationContext = Depends(allocation_context)
+):
     """
     Получение альтернативы по ID.
+    Поддерживает условные запросы: при совпадении If-None-Match возвращается 304.
     
     Args:
         alternative_id: ID альтернативы
+        request: HTTP запрос
+        response: HTTP ответ (для заголовков кэширования)
         db: Сессия базы данных
+        context: Ресурсы и задачи с индексами и массивами
         
     Returns:
         AlternativeResponse: Альтернатива с указанным ID
@@ -409,17 +588,18 @@ def get_alternative_by_id(alternative_id: int, db: Session = Depends(get_db)):
     if not alt:
         raise HTTPException(status_code=404, detail=f"Альтернатива с ID {alternative_id} не найдена")
     
+    alt_dict = _alternative_to_dict(alt, context)
+    headers, not_modified = _cache_headers(request, _make_etag("alternative", alt_dict))
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    
+    # Данные получены из БД, а не от клиента: модели собираются без повторной валидации
     allocations_response = []
-    for alloc in alt.allocations:
-        allocations_response.append(AllocationResponse(
-            resource_id=alloc.resource_id,
-            resource_name=alloc.resource.name,
-            task_id=alloc.task_id,
-            task_title=alloc.task.title,
-            hours=alloc.hours
-        ))
+    for alloc in alt_dict["allocations"]:
+        allocations_response.append(AllocationResponse.model_construct(**alloc))
     
-    return AlternativeResponse(
+    return AlternativeResponse.model_construct(
         id=alt.id,
         explanation=alt.explanation,
         score=alt.score,
@@ -443,78 +623,102 @@ def get_statistics(alternative_id: int = None, db: Session = Depends(get_db)):
     return DistributionStats(**stats)
 
 
+# Размер страницы экспорта по умолчанию (если передан только cursor)
+EXPORT_PAGE_SIZE = 50
+
+
 @app.get("/export/alternatives", tags=["Экспорт"])
-def export_alternatives(format: str = "json", db: Session = Depends(get_db)):
+def export_alternatives(
+    request: Request,
+    format: str = "json",
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_db),
+    context: AllocationContext = Depends(allocation_context)
+):
     """
     Экспорт альтернатив в различных форматах.
+    Без limit и cursor выгружаются все альтернативы (лучшие первыми).
+    С ними - страница альтернатив по возрастанию ID; курсор следующей страницы
+    возвращается в поле next_cursor (JSON) или заголовке X-Next-Cursor (CSV).
     
     Args:
+        request: HTTP запрос
         format: Формат экспорта ("json" или "csv")
+        limit: Размер страницы
+        cursor: ID последней альтернативы предыдущей страницы
         db: Сессия базы данных
+        context: Ресурсы и задачи с индексами и массивами
         
     Returns:
         Response с файлом для скачивания или JSON данными
     """
-    from fastapi.responses import Response, JSONResponse
-    import csv
-    import io
-    
-    alternatives = get_all_alternatives(db)
+    paginated = limit is not None or cursor is not None
+    next_cursor = None
+    if paginated:
+        limit = limit or EXPORT_PAGE_SIZE
+        alternatives = get_alternatives_page(db, limit, cursor)
+        if len(alternatives) == limit:
+            next_cursor = alternatives[-1].id
+    else:
+        alternatives = get_all_alternatives(db)
     
     if format.lower() == "csv":
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Заголовки
-        writer.writerow([
-            "Альтернатива ID", "Балл", "Пояснение",
-            "Ресурс", "Задача", "Часы"
-        ])
-        
-        # Данные
-        for alt in alternatives:
-            explanation_short = alt.explanation[:50] + "..." if len(alt.explanation) > 50 else alt.explanation
-            for alloc in alt.allocations:
-                writer.writerow([
-                    alt.id, alt.score, explanation_short,
-                    alloc.resource.name, alloc.task.title, alloc.hours
-                ])
-        
-        return Response(
-            content=output.getvalue(),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=alternatives.csv"}
-        )
+        headers, not_modified = _cache_headers(request, _make_etag(
+            "export", [
+                (alt.id, alt.score, alt.explanation,
+                 [(*context.allocation_names(a), a.hours) for a in alt.allocations])
+                for alt in alternatives
+            ], next_cursor
+        ))
+        if not_modified:
+            return Response(status_code=304, headers=headers)
+        
+        def csv_rows():
+            """Выдача CSV частями (по альтернативам): буфер очищается после каждой части."""
+            output = io.StringIO()
+            writer = csv.writer(output)
+            
+            # Заголовки
+            writer.writerow([
+                "Альтернатива ID", "Балл", "Пояснение",
+                "Ресурс", "Задача", "Часы"
+            ])
+            yield output.getvalue()
+            
+            # Данные
+            for alt in alternatives:
+                output.seek(0)
+                output.truncate(0)
+                explanation_short = alt.explanation[:50] + "..." if len(alt.explanation) > 50 else alt.explanation
+                for alloc in alt.allocations:
+                    resource_name, task_title = context.allocation_names(alloc)
+                    writer.writerow([
+                        alt.id, alt.score, explanation_short,
+                        resource_name, task_title, alloc.hours
+                    ])
+                yield output.getvalue()
+        
+        headers["Content-Disposition"] = "attachment; filename=alternatives.csv"
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = str(next_cursor)
+        return StreamingResponse(csv_rows(), media_type="text/csv", headers=headers)
     
     else:  # JSON
-        alternatives_data = []
-        for alt in alternatives:
-            allocations_data = []
-            for alloc in alt.allocations:
-                allocations_data.append({
-                    "resource_id": alloc.resource_id,
-                    "resource_name": alloc.resource.name,
-                    "task_id": alloc.task_id,
-                    "task_title": alloc.task.title,
-                    "hours": alloc.hours
-                })
-            
-            alternatives_data.append({
-                "id": alt.id,
-                "explanation": alt.explanation,
-                "score": alt.score,
-                "allocations": allocations_data
-            })
-        
-        return JSONResponse(content={
+        alternatives_data = [_alternative_to_dict(alt, context) for alt in alternatives]
+        
+        content = {
             "alternatives": alternatives_data,
             "total": len(alternatives_data)
-        })
+        }
+        if paginated:
+            content["next_cursor"] = next_cursor
+        return Response(content=_json_bytes(content), media_type="application/json")
 
 
 # ========== Вспомогательные endpoints ==========
 
-@app.post("/load-example-data", tags=["Вспомогательные"])
+@app.post("/load-example-data", response_class=Response, tags=["Вспомогательные"])
 def load_example_data(db: Session = Depends(get_db)):
     """
     Загрузка примерных данных для тестирования системы.
@@ -524,25 +728,20 @@ def load_example_data(db: Session = Depends(get_db)):
         db: Сессия базы данных
         
     Returns:
-        dict: Сообщение об успешной загрузке данных
+        Response: Сообщение об успешной загрузке данных (JSON)
     """
-    from example_data import get_example_resources, get_example_tasks
-    
-    # Добавляем примерные ресурсы
-    example_resources = get_example_resources()
-    for resource_data in example_resources:
-        create_resource(db, resource_data)
+    # Добавляем примерные ресурсы и задачи пакетными вставками
+    resources_added = bulk_create_resources(db, get_example_resources())
+    tasks_added = bulk_create_tasks(db, get_example_tasks())
     
-    # Добавляем примерные задачи
-    example_tasks = get_example_tasks()
-    for task_data in example_tasks:
-        create_task(db, task_data)
-    
-    return {
-        "message": "Примерные данные успешно загружены",
-        "resources_added": len(example_resources),
-        "tasks_added": len(example_tasks)
-    }
+    return Response(
+        content=_json_bytes({
+            "message": "Примерные данные успешно загружены",
+            "resources_added": resources_added,
+            "tasks_added": tasks_added
+        }),
+        media_type="application/json"
+    )
 
 
 @app.post("/clear-all-data", tags=["Вспомогательные"])
@@ -571,12 +770,120 @@ def clear_all_data_endpoint(db: Session = Depends(get_db)):
         )
 
 
+async def _dispatch_subrequest(request: Request, sub: BatchSubRequest) -> dict:
+    """
+    Выполнение подзапроса пакета внутри процесса через ASGI-вызов приложения,
+    без отдельного HTTP соединения.
+    
+    Args:
+        request: Исходный пакетный запрос (из него берется окружение ASGI)
+        sub: Подзапрос
+        
+    Returns:
+        dict: Код ответа и тело подзапроса
+    """
+    path, _, query = sub.url.partition("?")
+    body = json.dumps(sub.body).encode("utf-8") if sub.body is not None else b""
+    # Из окружения исходного запроса переносятся только параметры соединения
+    # и состояние lifespan; служебные ключи маршрутизации формируются заново
+    scope = {
+        key: request.scope[key]
+        for key in ("type", "asgi", "http_version", "scheme", "server", "client", "root_path", "app", "state")
+        if key in request.scope
+    }
+    scope.update({
+        "method": sub.method.upper(),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": query.encode("utf-8"),
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ],
+    })
+    
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+    
+    status = 500
+    chunks = []
+    
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+    
+    await request.app(scope, receive, send)
+    
+    content = b"".join(chunks)
+    try:
+        payload = json.loads(content) if content else None
+    except ValueError:
+        payload = content.decode("utf-8", errors="replace")
+    return {"status": status, "body": payload}
+
+
+@app.post("/batch", response_model=BatchResponse, tags=["Вспомогательные"])
+async def batch(batch_request: BatchRequest, request: Request):
+    """
+    Выполнение нескольких запросов к API за один HTTP вызов.
+    Подзапросы выполняются последовательно в порядке передачи,
+    поэтому последующие видят изменения предыдущих.
+    
+    Args:
+        batch_request: Список подзапросов (id, method, url, body)
+        request: Исходный HTTP запрос
+        
+    Returns:
+        BatchResponse: Результаты подзапросов по их id
+    """
+    responses = {}
+    for sub in batch_request.requests:
+        if sub.url.partition("?")[0].rstrip("/") == "/batch":
+            # Вложенные пакеты не поддерживаются
+            responses[sub.id] = {"status": 400, "body": {"detail": "Вложенный /batch не поддерживается"}}
+            continue
+        responses[sub.id] = await _dispatch_subrequest(request, sub)
+    return {"responses": responses}
+
+
 # ========== ML и рекомендации ==========
 
+def _alternative_metrics(alt, context: AllocationContext) -> Tuple[float, float, float, float]:
+    """
+    Расчет характеристик альтернативы для сохранения выбора пользователя.
+    Распределения один раз переводятся в массивы, сам расчет выполняет
+    скомпилированное ядро score_alternative.
+    
+    Args:
+        alt: Альтернатива с распределениями
+        context: Подготовленные ресурсы и задачи
+        
+    Returns:
+        Tuple[float, float, float, float]: Покрытие, приоритетный бонус,
+        равномерность загрузки и штраф за перегрузку
+    """
+    allocations = alt.allocations
+    hours = np.fromiter((a.hours for a in allocations), dtype=np.float64, count=len(allocations))
+    # Распределения на отсутствующие в списках задачи/ресурсы получают индекс -1
+    task_idx = np.fromiter((context.task_pos.get(a.task_id, -1) for a in allocations),
+                           dtype=np.int64, count=len(allocations))
+    resource_idx = np.fromiter((context.resource_pos.get(a.resource_id, -1) for a in allocations),
+                               dtype=np.int64, count=len(allocations))
+    
+    coverage, priority_score, balance_score, overload_penalty = score_alternative(
+        hours, task_idx, resource_idx, context.required, context.priority, context.available
+    )
+    return float(coverage), float(priority_score), float(balance_score), float(overload_penalty)
+
+
 @app.post("/alternative/{alternative_id}/select", tags=["ML и рекомендации"])
 def select_alternative(
     alternative_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    context: AllocationContext = Depends(allocation_context)
 ):
     """
     Сохранение выбранной пользователем альтернативы.
@@ -585,6 +892,7 @@ def select_alternative(
     Args:
         alternative_id: ID выбранной альтернативы
         db: Сессия базы данных
+        context: Ресурсы и задачи с индексами и массивами
         
     Returns:
         dict: Сообщение об успешном сохранении
@@ -592,97 +900,50 @@ def select_alternative(
     Raises:
         HTTPException: Если альтернатива не найдена
     """
-    from ml_recommender import AlternativeRecommender
-    
-    alt = get_alternative(db, alternative_id)
-    if not alt:
-        raise HTTPException(status_code=404, detail="Альтернатива не найдена")
-    
-    resources = get_all_resources(db)
-    tasks = get_all_tasks(db)
-    
-    # Вычисляем характеристики альтернативы
-    total_required = sum(t.required_hours for t in tasks)
-    total_allocated = sum(a.hours for a in alt.allocations)
-    coverage = total_allocated / total_required if total_required > 0 else 0
-    
-    # Приоритетный бонус
-    priority_coverage = {}
-    for alloc in alt.allocations:
-        task_id = alloc.task_id
-        if task_id not in priority_coverage:
-            priority_coverage[task_id] = 0.0
-        priority_coverage[task_id] += alloc.hours
-    
-    priority_score = 0.0
-    if tasks:
-        priority_scores = []
-        for task in tasks:
-            task_coverage = min(1.0, priority_coverage.get(task.id, 0) / task.required_hours)
-            priority_weight = (6 - task.priority) / 5.0
-            priority_scores.append(task_coverage * priority_weight)
-        priority_score = sum(priority_scores) / len(priority_scores) if priority_scores else 0
-    
-    # Равномерность загрузки
-    resource_load = {}
-    for alloc in alt.allocations:
-        if alloc.resource_id not in resource_load:
-            resource_load[alloc.resource_id] = 0.0
-        resource_load[alloc.resource_id] += alloc.hours
-    
-    utilizations = []
-    for resource in resources:
-        if resource.available_hours > 0:
-            utilization = resource_load.get(resource.id, 0) / resource.available_hours
-            utilizations.append(utilization)
-    
-    import numpy as np
-    balance_score = 1.0 - np.std(utilizations) if utilizations else 0.5
-    balance_score = max(0, min(1, balance_score))
-    
-    # Штраф за перегрузку
-    overload_penalty = 0.0
-    if total_required > 0:
-        total_overload = sum(
-            max(0, resource_load.get(r.id, 0) - r.available_hours)
-            for r in resources
-        )
-        overload_penalty = min(1.0, total_overload / total_required)
-    
-    # Предсказание ML модели (если доступно)
-    ml_score = None
     try:
-        recommender = AlternativeRecommender()
-        alt_dict = {
-            "id": alt.id,
-            "explanation": alt.explanation,
-            "score": alt.score,
-            "allocations": [
-                {
-                    "resource_id": a.resource_id,
-                    "task_id": a.task_id,
-                    "hours": a.hours
-                }
-                for a in alt.allocations
-            ]
-        }
-        ml_score = recommender.predict_proba(alt_dict, resources, tasks)
+        recommender = get_recommender()
     except Exception as e:
-        print(f"Ошибка предсказания ML: {e}")
+        print(f"Ошибка загрузки ML модели: {e}")
+        recommender = None
+    
+    if recommender is not None and recommender.is_trained:
+        # Модели нужны сами распределения: характеристики считаются по ним же
+        alt = get_alternative(db, alternative_id)
+        if not alt:
+            raise HTTPException(status_code=404, detail="Альтернатива не найдена")
+        
+        coverage, priority_score, balance_score, overload_penalty = _alternative_metrics(alt, context)
+        scores = {
+            "coverage": coverage,
+            "priority_score": priority_score,
+            "balance_score": balance_score,
+            "overload_penalty": overload_penalty,
+            "total_score": alt.score,
+            "num_resources": len(context.resources),
+            "num_tasks": len(context.tasks)
+        }
+        
+        # Предсказание ML модели
+        ml_score = None
+        try:
+            ml_score = recommender.predict_proba(
+                _alternative_to_dict(alt, context), context.resources, context.tasks,
+                data_version=(context.version, get_alternatives_version()),
+                ctx=_feature_context(context)
+            )
+        except Exception as e:
+            print(f"Ошибка предсказания ML: {e}")
+    else:
+        # Без обученной модели распределения не нужны: характеристики
+        # агрегируются в БД одним запросом
+        scores = calculate_alternative_scores(db, alternative_id)
+        if scores is None:
+            raise HTTPException(status_code=404, detail="Альтернатива не найдена")
+        # Необученная модель возвращает нейтральную вероятность, не глядя на признаки
+        ml_score = recommender.predict_proba({}, [], []) if recommender is not None else None
     
     # Сохраняем выбор
-    save_user_choice(
-        db=db,
-        alternative_id=alternative_id,
-        coverage=coverage,
-        priority_score=priority_score,
-        balance_score=balance_score,
-        overload_penalty=overload_penalty,
-        total_score=alt.score,
-        num_resources=len(resources),
-        num_tasks=len(tasks),
-        ml_score=ml_score
-    )
+    save_user_choice(db=db, alternative_id=alternative_id, ml_score=ml_score, **scores)
     
     return {
         "message": "Выбор сохранен для обучения ML модели",
@@ -702,89 +963,67 @@ def train_ml_model(db: Session = Depends(get_db)):
     Returns:
         dict: Результаты обучения модели
     """
-    from ml_recommender import AlternativeRecommender
-    
     try:
-        # Получаем все выборы
-        choices = get_all_user_choices(db)
+        # Количество выборов; сами выборы читаются из БД потоково ниже
+        choices_count = count_user_choices(db)
         
-        if len(choices) < 5:
+        if choices_count < 5:
             return {
                 "status": "insufficient_data",
-                "message": f"Недостаточно данных для обучения. Нужно минимум 5 выборов, получено {len(choices)}",
-                "choices_count": len(choices)
+                "message": f"Недостаточно данных для обучения. Нужно минимум 5 выборов, получено {choices_count}",
+                "choices_count": choices_count
             }
         
         # Получаем все альтернативы, которые были сгенерированы вместе с выбранными
         # Для этого нужно получить все альтернативы из тех же сессий
         # Упрощенный подход: используем только выбранные альтернативы как положительные примеры
         
-        resources = get_all_resources(db)
-        tasks = get_all_tasks(db)
+        context = get_allocation_context(db)
+        resources = context.resources
+        tasks = context.tasks
         
+        # Обучение изменяет модель, поэтому используется отдельный экземпляр, а не общий
+        # из get_recommender; после сохранения модели общий экземпляр перезагрузится сам
         recommender = AlternativeRecommender()
         
-        # Подготавливаем данные для обучения
-        X = []
+        # Подготавливаем данные для обучения: сначала собираем альтернативы,
+        # затем считаем признаки для всех сразу
+        training_alternatives = []
         y = []
+        selected_ids = set()
         
-        for choice in choices:
+        for choice in iter_all_user_choices(db):
+            selected_ids.add(choice.alternative_id)
+            
             # Получаем альтернативу
             alt = get_alternative(db, choice.alternative_id)
             if not alt:
                 continue
             
-            # Извлекаем признаки
-            alt_dict = {
-                "id": alt.id,
-                "explanation": alt.explanation,
-                "score": alt.score,
-                "allocations": [
-                    {
-                        "resource_id": a.resource_id,
-                        "task_id": a.task_id,
-                        "hours": a.hours
-                    }
-                    for a in alt.allocations
-                ]
-            }
-            
-            features = recommender.extract_features(alt_dict, resources, tasks)
-            X.append(features)
+            training_alternatives.append(_alternative_to_dict(alt, context))
             y.append(1)  # Выбранная альтернатива = положительный пример
         
         # Добавляем отрицательные примеры (не выбранные альтернативы)
         # Берем случайные альтернативы из истории, которые не были выбраны
         all_alternatives = get_all_alternatives(db)
-        selected_ids = {choice.alternative_id for choice in choices}
         
         # Добавляем несколько не выбранных альтернатив как отрицательные примеры
-        negative_count = min(len(y), len([a for a in all_alternatives if a.id not in selected_ids]))
         for alt in all_alternatives:
-            if alt.id not in selected_ids and len(y) < len(choices) * 2:
-                alt_dict = {
-                    "id": alt.id,
-                    "explanation": alt.explanation,
-                    "score": alt.score,
-                    "allocations": [
-                        {
-                            "resource_id": a.resource_id,
-                            "task_id": a.task_id,
-                            "hours": a.hours
-                        }
-                        for a in alt.allocations
-                    ]
-                }
-                features = recommender.extract_features(alt_dict, resources, tasks)
-                X.append(features)
+            if alt.id not in selected_ids and len(y) < choices_count * 2:
+                training_alternatives.append(_alternative_to_dict(alt, context))
                 y.append(0)  # Не выбранная = отрицательный пример
         
+        # Признаки всех примеров одним параллельным расчетом
+        X = recommender.extract_features_batch(
+            training_alternatives, resources, tasks, ctx=_feature_context(context)
+        )
+        
         # Обучаем модель
         result = recommender.train(X, y)
         
         return {
             **result,
-            "choices_used": len(choices),
+            "choices_used": choices_count,
             "total_samples": len(X)
         }
     except Exception as e:
@@ -795,32 +1034,33 @@ def train_ml_model(db: Session = Depends(get_db)):
 
 
 @app.get("/ml/info", response_model=MLModelInfo, tags=["ML и рекомендации"])
-def get_ml_model_info():
+def get_ml_model_info(request: Request, response: Response):
     """
     Получение информации о состоянии ML модели.
+    Поддерживает условные запросы: при совпадении If-None-Match возвращается 304.
+    
+    Args:
+        request: HTTP запрос
+        response: HTTP ответ (для заголовков кэширования)
     
     Returns:
         MLModelInfo: Информация о модели
     """
-    from ml_recommender import AlternativeRecommender
-    
     try:
-        recommender = AlternativeRecommender()
-        info = recommender.get_model_info()
-        
-        # Получаем дополнительную информацию о точности
-        import os
-        if os.path.exists("ml_model.pkl"):
-            # Можно добавить загрузку метрик из файла
-            pass
-        
-        return MLModelInfo(**info)
+        recommender = get_recommender()
+        info = MLModelInfo(**recommender.get_model_info())
     except Exception as e:
-        return MLModelInfo(
+        info = MLModelInfo(
             is_trained=False,
             ml_available=False,
             model_exists=False
         )
+    
+    headers, not_modified = _cache_headers(request, _make_etag("ml_info", info.model_dump()))
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return info
 
 
 @app.get("/", tags=["Информация"])
@@ -828,43 +1068,55 @@ def root():
     """
     Корневой endpoint - перенаправляет на веб-интерфейс.
     """
-    from fastapi.responses import FileResponse
-    import os
     return FileResponse("static/index.html")
 
 
-@app.get("/api/info", tags=["Информация"])
-def api_info():
+# Информация о системе не меняется во время работы, поэтому JSON и ETag готовятся один раз
+_API_INFO_BYTES = _json_bytes({
+    "message": "Система поддержки принятия решений (СППР) для оптимизации планирования ресурсов",
+    "version": "1.0.0",
+    "endpoints": {
+        "resources": {
+            "POST /resource": "Добавить ресурс",
+            "GET /resources": "Получить все ресурсы"
+        },
+        "tasks": {
+            "POST /task": "Добавить задачу",
+            "GET /tasks": "Получить все задачи"
+        },
+        "alternatives": {
+            "GET /alternatives": "Получить альтернативы распределения ресурсов"
+        },
+        "helpers": {
+            "POST /load-example-data": "Загрузить примерные данные",
+            "GET /docs": "Документация API (Swagger UI)"
+        }
+    }
+})
+_API_INFO_ETAG = _make_etag("api_info", _API_INFO_BYTES)
+
+
+@app.get("/api/info", response_class=Response, tags=["Информация"])
+def api_info(request: Request):
     """
     API endpoint с информацией о системе.
+    Поддерживает условные запросы: при совпадении If-None-Match возвращается 304.
+    
+    Args:
+        request: HTTP запрос
     
     Returns:
-        dict: Информация о системе и доступных endpoints
+        Response: Информация о системе и доступных endpoints (JSON)
     """
-    return {
-        "message": "Система поддержки принятия решений (СППР) для оптимизации планирования ресурсов",
-        "version": "1.0.0",
-        "endpoints": {
-            "resources": {
-                "POST /resource": "Добавить ресурс",
-                "GET /resources": "Получить все ресурсы"
-            },
-            "tasks": {
-                "POST /task": "Добавить задачу",
-                "GET /tasks": "Получить все задачи"
-            },
-            "alternatives": {
-                "GET /alternatives": "Получить альтернативы распределения ресурсов"
-            },
-            "helpers": {
-                "POST /load-example-data": "Загрузить примерные данные",
-                "GET /docs": "Документация API (Swagger UI)"
-            }
-        }
-    }
+    headers, not_modified = _cache_headers(request, _API_INFO_ETAG)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(content=_API_INFO_BYTES, media_type="application/json", headers=headers)
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvicorn[standard] сам выбирает uvloop и httptools, если они установлены.
+    # Воркер один: кэши ресурсов/задач и модели живут в памяти процесса
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto", http="auto")
 
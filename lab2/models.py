@@ -3,7 +3,7 @@
 Использует SQLAlchemy ORM для определения структуры таблиц.
 """
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -67,8 +67,13 @@ class Alternative(Base):
     explanation = Column(Text, nullable=False)
     score = Column(Float, nullable=False, default=0.0)
     
-    # Связь с распределениями ресурсов
-    allocations = relationship("Allocation", back_populates="alternative", cascade="all, delete-orphan")
+    # Связь с распределениями ресурсов: для набора альтернатив распределения
+    # загружаются одним запросом IN (selectin), без отдельного запроса на каждую.
+    # Порядок задается явно: иначе он зависит от выбранного СУБД индекса
+    allocations = relationship(
+        "Allocation", back_populates="alternative", cascade="all, delete-orphan",
+        lazy="selectin", order_by="Allocation.id"
+    )
 
 
 class Allocation(Base):
@@ -84,6 +89,12 @@ class Allocation(Base):
         hours: Количество часов, выделенных данному ресурсу на данную задачу
     """
     __tablename__ = "allocations"
+    __table_args__ = (
+        # Распределения альтернативы (в т.ч. с группировкой по ресурсу) - по префиксу индекса
+        Index("ix_alloc_alt_res_task", "alternative_id", "resource_id", "task_id"),
+        # Распределения ресурса (в т.ч. по задаче)
+        Index("ix_alloc_resource_task", "resource_id", "task_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     alternative_id = Column(Integer, ForeignKey("alternatives.id"), nullable=False)
@@ -4,7 +4,7 @@ Pydantic схемы для валидации данных API.
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Dict
 
 
 class ResourceBase(BaseModel):
@@ -75,7 +75,10 @@ class AlternativesListResponse(BaseModel):
     alternatives: List[AlternativeResponse]
     total: int
     recommendations: Optional[List[Dict]] = None
-    recommendations: Optional[List[Dict]] = None
+    
+    class Config:
+        # Схема валидации строится при первом использовании, а не при импорте
+        defer_build = True
 
 
 class UserChoiceCreate(BaseModel):
@@ -138,3 +141,26 @@ class DistributionStats(BaseModel):
     task_stats: List[TaskStats]
     warnings: List[str]
 
+
+class BatchSubRequest(BaseModel):
+    """Один подзапрос пакетного запроса."""
+    id: str = Field(..., description="Идентификатор подзапроса (ключ в ответе)")
+    method: str = Field("GET", description="HTTP метод")
+    url: str = Field(..., description="Путь endpoint (с query-строкой)")
+    body: Optional[Any] = Field(None, description="JSON тело подзапроса")
+
+
+class BatchRequest(BaseModel):
+    """Пакет подзапросов, выполняемых за один HTTP вызов."""
+    requests: List[BatchSubRequest]
+
+
+class BatchSubResponse(BaseModel):
+    """Результат одного подзапроса."""
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Результаты подзапросов по их идентификаторам."""
+    responses: Dict[str, BatchSubResponse]
@@ -0,0 +1,8 @@
+"""
+Общие настройки тестов: модули lab2 импортируются напрямую (from algorithms import ...).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
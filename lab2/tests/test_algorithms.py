@@ -0,0 +1,64 @@
+"""
+Тесты алгоритмов генерации альтернатив распределения ресурсов.
+"""
+
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from algorithms import ALLOCATION_DTYPE, _normalize_allocations, generate_alternatives
+
+
+def _make_resources(hours):
+    return [
+        SimpleNamespace(id=i + 1, name=f"Ресурс {i + 1}", type="разработчик", available_hours=h)
+        for i, h in enumerate(hours)
+    ]
+
+
+def _make_tasks(hours, priority=1):
+    return [
+        SimpleNamespace(id=i + 1, title="Разработка модуля", required_hours=h, priority=priority)
+        for i, h in enumerate(hours)
+    ]
+
+
+def _assert_unique_pairs(alternatives):
+    for alt in alternatives:
+        pairs = [(a["resource_id"], a["task_id"]) for a in alt["allocations"]]
+        assert len(pairs) == len(set(pairs))
+
+
+def test_generate_alternatives_without_duplicate_pairs():
+    """Регрессия: на этих данных порог загрузки давал повторное распределение той же пары."""
+    resources = _make_resources([28.1, 3.9, 35.7])
+    tasks = _make_tasks([23.1, 29.5])
+
+    alternatives = generate_alternatives(resources, tasks)
+
+    assert alternatives
+    _assert_unique_pairs(alternatives)
+
+
+def test_generate_alternatives_random_inputs():
+    rng = random.Random(0)
+    for _ in range(300):
+        resources = _make_resources([round(rng.uniform(0.5, 40), 1) for _ in range(rng.randint(1, 4))])
+        tasks = _make_tasks([round(rng.uniform(0.5, 40), 1) for _ in range(rng.randint(1, 4))])
+
+        _assert_unique_pairs(generate_alternatives(resources, tasks))
+
+
+def test_normalize_allocations_merges_pairs():
+    records = np.array(
+        [(1, 2, 0.3), (3, 1, 5.0), (1, 2, 0.3), (2, 2, 0.4), (3, 1, 1.0)],
+        dtype=ALLOCATION_DTYPE
+    )
+
+    normalized = _normalize_allocations([{"explanation": "", "score": 1.0, "allocations": records}])
+
+    allocations = normalized[0]["allocations"]
+    assert allocations["resource_id"].tolist() == [1, 3]
+    assert allocations["task_id"].tolist() == [2, 1]
+    assert np.allclose(allocations["hours"], [0.6, 6.0])
@@ -0,0 +1,94 @@
+"""
+Тесты CRUD операций на базе SQLite в памяти.
+"""
+
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import crud
+from algorithms import generate_alternatives
+from database import Base
+from main import _alternative_metrics
+from schemas import ResourceCreate, TaskCreate
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        crud.clear_all_data(session)
+        session.close()
+        engine.dispose()
+
+
+def _random_alternatives(rng, resources, tasks):
+    """Альтернативы алгоритмов и случайные распределения (в том числе с перегрузкой)."""
+    alternatives = generate_alternatives(resources, tasks)
+    for _ in range(3):
+        alternatives.append({
+            "explanation": "Случайное распределение",
+            "score": rng.uniform(0, 100),
+            "allocations": [
+                {
+                    "resource_id": rng.choice(resources).id,
+                    "task_id": rng.choice(tasks).id,
+                    "hours": round(rng.uniform(0.5, 150), 1)
+                }
+                for _ in range(rng.randint(1, 8))
+            ]
+        })
+    return alternatives
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_alternative_scores_match_metrics(db, seed):
+    """Агрегирующий запрос дает те же характеристики, что и расчет по распределениям."""
+    rng = random.Random(seed)
+    crud.bulk_create_resources(db, [
+        ResourceCreate(
+            name=f"Ресурс {i}",
+            type=rng.choice(["разработчик", "дизайнер", "тестировщик"]),
+            available_hours=round(rng.uniform(1, 200), 1)
+        )
+        for i in range(rng.randint(1, 7))
+    ])
+    crud.bulk_create_tasks(db, [
+        TaskCreate(
+            title=rng.choice(["Разработка", "Дизайн", "Тестирование", "Документация"]),
+            required_hours=round(rng.uniform(1, 250), 1),
+            priority=rng.randint(1, 5)
+        )
+        for _ in range(rng.randint(1, 7))
+    ])
+    resources = crud.get_all_resources(db)
+    tasks = crud.get_all_tasks(db)
+    alternative_ids = crud.create_alternatives(db, _random_alternatives(rng, resources, tasks))
+    context = crud.get_allocation_context(db)
+
+    for alternative_id in alternative_ids:
+        scores = crud.calculate_alternative_scores(db, alternative_id)
+        alternative = crud.get_alternative(db, alternative_id)
+
+        assert (
+            scores["coverage"], scores["priority_score"],
+            scores["balance_score"], scores["overload_penalty"]
+        ) == pytest.approx(_alternative_metrics(alternative, context))
+        assert scores["total_score"] == alternative.score
+        assert scores["num_resources"] == len(resources)
+        assert scores["num_tasks"] == len(tasks)
+
+
+def test_alternative_scores_missing_alternative(db):
+    assert crud.calculate_alternative_scores(db, 1) is None